@@ -24,6 +24,11 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata  # type: ignore
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    # The archive partitions are created at runtime by the archival job, they aren't models
+    return not (type_ == "table" and reflected and name.startswith("change_request_archive_"))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -40,6 +45,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -49,7 +55,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
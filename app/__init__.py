@@ -0,0 +1,5 @@
+import time
+
+
+# Reference point of the startup profile, see app/lifespan.py
+IMPORT_STARTED_AT = time.perf_counter()
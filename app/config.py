@@ -5,11 +5,35 @@ The config is loading the values for each parameter from the environment
 (Environment Variables Values) using pydantic's `BaseSettings`.
 """
 
-from typing import Any
+import math
+import os
+from pathlib import Path
+from typing import Any, Literal
 
 from pydantic import BaseSettings, PostgresDsn, validator
 
 
+def available_cpus(cgroup: Path = Path("/sys/fs/cgroup")) -> int:
+    """
+    Returns the CPUs this process may use: the ones it is pinned to, capped by the container's
+    CPU quota (cgroup v2 `cpu.max`, or v1 `cpu.cfs_quota_us` / `cpu.cfs_period_us`), which
+    `os.cpu_count()` ignores.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    try:
+        if (cgroup / "cpu.max").exists():
+            quota, period = (cgroup / "cpu.max").read_text().split()
+        else:
+            quota = (cgroup / "cpu" / "cpu.cfs_quota_us").read_text().strip()
+            period = (cgroup / "cpu" / "cpu.cfs_period_us").read_text().strip()
+    except (OSError, ValueError):
+        return cpus or 1
+    # No quota is "max" (v2) or -1 (v1)
+    if quota not in ("max", "-1"):
+        cpus = min(cpus or 1, math.ceil(int(quota) / int(period)))
+    return max(cpus or 1, 1)
+
+
 class Settings(BaseSettings):
     # CORS Middleware
     CORS_ORIGINS: list[str]
@@ -38,12 +62,85 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB')}",
         )
 
+    # PostgreSQL Connection Pool (per worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Connections opened (and primed with the hot statements) on startup
+    DB_POOL_WARMUP: int = 5
+    # Prepared statements kept per connection
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+
+    # Released change requests older than this are moved to the archive (app/jobs/archive.py)
+    ARCHIVE_AFTER_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 1000
+
+    # Admission control (per worker): concurrent requests, then queued up to QUEUE_TIMEOUT seconds
+    ADMISSION_MAX_READS: int = 64
+    ADMISSION_MAX_WRITES: int = 16
+    ADMISSION_QUEUE_SIZE: int = 128
+    ADMISSION_QUEUE_TIMEOUT: float = 2
+    # Requests per second per client (and the burst allowed above it), disabled when unset
+    RATE_LIMIT_RATE: float | None
+    RATE_LIMIT_BURST: int = 50
+
+    # Request profiling (app/middleware/profiling.py): on demand with the token (X-Profile header
+    # or profile query parameter), and 1 in SAMPLE_EVERY requests when it's not 0
+    PROFILING_TOKEN: str | None
+    PROFILING_SAMPLE_EVERY: int = 0
+    PROFILING_DIR: str = "/tmp/profiles"
+
+    # Responses smaller than this (bytes) are not compressed (app/middleware/compression.py)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # Audit log (app/utils/audit.py), written in batches of BATCH_SIZE or every FLUSH_INTERVAL
+    # seconds, entries beyond MAX_BUFFERED are dropped while the database is not keeping up
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 1
+    AUDIT_MAX_BUFFERED: int = 100000
+
     # Pagination
     PAGE_SIZE: int = 1000
 
-    # # SAP
-    # SAP_AUTH_URL: str
-    # SAP_BASIC_AUTH_HEADER: str
+    # Server (read by app/server.py and gunicorn.conf.py)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = available_cpus()
+    SERVER_LOOP: Literal["auto", "asyncio", "uvloop"] = "uvloop"
+    SERVER_HTTP: Literal["auto", "h11", "httptools"] = "httptools"
+    SERVER_KEEP_ALIVE: int = 5
+    SERVER_BACKLOG: int = 2048
+    SERVER_ACCESS_LOG: bool = True
+    # Proxies whose X-Forwarded-For / X-Forwarded-Proto headers set the client address
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    SERVER_LOG_LEVEL: Literal["critical", "error", "warning", "info", "debug"] = "info"
+    # Recycle a worker after it served this many requests (0 disables), jitter spreads the restarts.
+    # gunicorn only, uvicorn's own process manager doesn't replace the workers which exit
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_TIMEOUT: int = 60
+    # Seconds a stopping worker waits for its in-flight requests before it is killed
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+
+    # Report the import and initialization costs on startup (see scripts/entrypoint.sh)
+    STARTUP_PROFILE: bool = False
+
+    # SAP (integration is disabled while SAP_AUTH_URL is not set)
+    SAP_AUTH_URL: str | None
+    SAP_BASIC_AUTH_HEADER: str | None
+    # Seconds, per operation (auth, fetch_content, import), SAP_TIMEOUT for the others
+    SAP_TIMEOUT: float = 10
+    SAP_TIMEOUTS: dict[str, float] = {"auth": 5, "fetch_content": 30, "import": 300}
+    # Consecutive failures opening the circuit, and seconds until a trial request is let through
+    SAP_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    SAP_CIRCUIT_RESET_TIMEOUT: float = 30
+    # Seconds after which a slow idempotent request is sent again (hedged), disabled when unset
+    SAP_HEDGE_DELAY: float | None
+    # Concurrent transport imports the target systems accept (tp import slots)
+    SAP_IMPORT_SLOTS: int = 4
+    # Content of modifiable change requests is cached for TTL seconds, up to MAX_BYTES in total
+    # (released change requests are cached forever)
+    SAP_CONTENT_CACHE_TTL: int = 300
+    SAP_CONTENT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
 
     class Config:
         case_sensitive = True
@@ -1,2 +1,9 @@
 from .branch import branch
 from .change_request import change_request
+from .tombstone import tombstone
+from .change_request_object import change_request_object
+from .sap_content import sap_content
+from .change_request_archive import change_request_archive
+from .audit_entry import audit_entry
+from .branch_stats import branch_stats
+from .change_tracking import change_tracking
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config import settings
+from app.models import AuditEntry
+from app.schemas import AuditEntry as AuditEntrySchema
+from .base import BaseCRUD
+
+
+class AuditEntryCRUD(BaseCRUD[AuditEntry, AuditEntrySchema, AuditEntrySchema]):
+    async def read_many_filtered(
+        self,
+        session: AsyncSession,
+        entity: Optional[str] = None,
+        key: Optional[str] = None,
+        before: Optional[int] = None,
+        limit: int = settings.PAGE_SIZE,
+    ) -> list[AuditEntry]:
+        """
+        Returns the newest entries first, `before` (an entry id) pages through the older ones.
+        """
+        statement = select(self.model).order_by(self.model.id.desc())
+        if entity is not None:
+            statement = statement.where(self.model.entity == entity)
+        if key is not None:
+            statement = statement.where(self.model.key == key)
+        if before is not None:
+            statement = statement.where(self.model.id < before)
+        statement = statement.limit(min(limit, settings.PAGE_SIZE))
+        result = await session.execute(statement=statement)
+        return result.scalars().all()
+
+
+audit_entry = AuditEntryCRUD(model=AuditEntry)
@@ -3,16 +3,32 @@ Defines base class with generic logic for CRUD operations.
 Every model should inherit this logic and enrich/override it if needed.
 """
 
-from typing import Any, Generic, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import BigInteger, Text, cast, func, inspect, lambda_stmt, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import load_only, raiseload, selectinload
+from sqlalchemy.sql import StatementLambdaElement
 
 from app.config import settings
-from app.models import Base
+from app.models import Base, Tombstone
+from app.utils import audit
+from app.utils.singleflight import SingleFlight
 
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -23,6 +39,55 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        self.reads = SingleFlight(name=f"{model.__tablename__}_reads")
+        self._load_options: dict[tuple[str, ...], list[Any]] = {}
+
+    def load_options(self, fields: Optional[Sequence[str]]) -> list[Any]:
+        """
+        Loads only the requested fields (sparse fieldsets), all of them when fields is None.
+        Relationships which were not requested are not loaded at all.
+        """
+        if fields is None:
+            return []
+        key = tuple(fields)
+        if key not in self._load_options:
+            self._load_options[key] = self._build_load_options(fields)
+        return self._load_options[key]
+
+    def _build_load_options(self, fields: Sequence[str]) -> list[Any]:
+        mapper = inspect(self.model)
+        columns = [getattr(self.model, field) for field in fields if field in mapper.column_attrs]
+        relationships = [
+            selectinload(relationship.class_attribute)
+            if relationship.key in fields
+            else raiseload(relationship.class_attribute)
+            for relationship in mapper.relationships
+        ]
+        return [load_only(*columns), *relationships]
+
+    def with_load_options(
+        self,
+        statement: StatementLambdaElement,
+        fields: Optional[Sequence[str]],
+    ) -> StatementLambdaElement:
+        options = self.load_options(fields)
+        if not options:
+            return statement
+        # The options are the same objects for the same fields, so the fields are the cache key
+        return statement.add_criteria(
+            lambda statement: statement.options(*options),
+            track_on=[",".join(fields)],
+        )
+
+    def read_statement(
+        self,
+        obj_id: Any,
+        fields: Optional[Sequence[str]] = None,
+    ) -> StatementLambdaElement:
+        # Lambda statements are built (and compiled) once, later calls only bind the parameters
+        model = self.model
+        statement = lambda_stmt(lambda: select(model).where(model.id == obj_id))
+        return self.with_load_options(statement, fields)
 
     async def create(
         self,
@@ -32,17 +97,69 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         in_obj_data = jsonable_encoder(in_obj)
         db_obj = self.model(**in_obj_data)
         session.add(db_obj)
+        await session.flush()
+        audit.record(
+            session,
+            "create",
+            self.model.__tablename__,
+            inspect(db_obj).identity[0],
+            after=audit.snapshot(db_obj),
+        )
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
 
-    async def read(self, session: AsyncSession, obj_id: Any) -> Optional[ModelType]:
-        statement = select(self.model).where(self.model.id == obj_id)
-        result = await session.execute(statement=statement)
-        return result.scalars().first()
+    async def read(
+        self,
+        session: AsyncSession,
+        obj_id: Any,
+        coalesce: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[ModelType]:
+        async def execute(session: AsyncSession) -> Optional[ModelType]:
+            statement = self.read_statement(obj_id=obj_id, fields=fields)
+            result = await session.execute(statement=statement)
+            return result.scalars().first()
 
-    async def read_or_404(self, session: AsyncSession, obj_id: Any) -> ModelType:
-        db_obj = await self.read(session=session, obj_id=obj_id)
+        if not coalesce:
+            return await execute(session)
+        return await self.read_coalesced(
+            session=session,
+            key=("read", obj_id, tuple(fields) if fields else None),
+            execute=execute,
+        )
+
+    async def read_coalesced(
+        self,
+        session: AsyncSession,
+        key: Hashable,
+        execute: Callable[[AsyncSession], Awaitable[Optional[ModelType]]],
+    ) -> Optional[ModelType]:
+        """
+        Runs the read once for all the concurrent callers with the same key (see SingleFlight).
+        Use it for read only requests, the object is shared until it's merged into each session.
+        """
+
+        async def execute_alone() -> Optional[ModelType]:
+            # On a session of its own (same bind as the caller's), not the first caller's: that
+            # one is closed when its request is cancelled, and may be in a failed transaction
+            async with AsyncSession(bind=session.bind, expire_on_commit=False) as own_session:
+                return await execute(own_session)
+
+        db_obj, _ = await self.reads.do(key=key, fn=execute_alone)
+        if db_obj is not None:
+            # Copied into every caller's session, the first caller's included
+            db_obj = await session.merge(db_obj, load=False)
+        return db_obj
+
+    async def read_or_404(
+        self,
+        session: AsyncSession,
+        obj_id: Any,
+        coalesce: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> ModelType:
+        db_obj = await self.read(session=session, obj_id=obj_id, coalesce=coalesce, fields=fields)
         if not db_obj:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -55,8 +172,64 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         session: AsyncSession,
         skip: int = 0,
         limit: int = settings.PAGE_SIZE,
+        fields: Optional[Sequence[str]] = None,
     ) -> list[ModelType]:
-        statement = select(self.model).offset(skip).limit(min(limit, settings.PAGE_SIZE))
+        statement = (
+            select(self.model)
+            .offset(skip)
+            .limit(min(limit, settings.PAGE_SIZE))
+            .options(*self.load_options(fields))
+        )
+        result = await session.execute(statement=statement)
+        return result.scalars().all()
+
+    async def read_many_since(
+        self,
+        session: AsyncSession,
+        since: int,
+        limit: int = settings.PAGE_SIZE,
+    ) -> list[ModelType]:
+        statement = (
+            select(self.model)
+            .where(self.model.version > since)
+            .order_by(self.model.version)
+            .limit(min(limit, settings.PAGE_SIZE))
+            .options(raiseload("*"))
+        )
+        result = await session.execute(statement=statement)
+        return result.scalars().all()
+
+    async def read_many_committed_late(
+        self,
+        session: AsyncSession,
+        until: int,
+        transaction_id: int,
+        writers: Sequence[int] = (),
+        after: int = 0,
+        limit: int = settings.PAGE_SIZE,
+    ) -> list[ModelType]:
+        """
+        Returns the rows of versions `after` (excluded) to `until` written by the `writers`
+        transactions, or by the transaction `transaction_id` or a later one: a sync which read past
+        their version may have missed them, they were committed after it read. The rows of the
+        current transaction are never late to it.
+        """
+        current = cast(cast(func.pg_current_xact_id_if_assigned(), Text), BigInteger)
+        statement = (
+            select(self.model)
+            .where(
+                self.model.version > after,
+                self.model.version <= until,
+                or_(
+                    self.model.transaction_id >= transaction_id,
+                    self.model.transaction_id.in_(writers),
+                ),
+                self.model.transaction_id.is_distinct_from(current),
+            )
+            .order_by(self.model.version)
+            .limit(min(limit, settings.PAGE_SIZE))
+            .options(raiseload("*"))
+        )
         result = await session.execute(statement=statement)
         return result.scalars().all()
 
@@ -67,6 +240,7 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         in_obj: Union[UpdateSchemaType, dict[str, Any]],
     ) -> ModelType:
         obj_data = jsonable_encoder(db_obj)
+        before = audit.snapshot(db_obj)
         if isinstance(in_obj, dict):
             update_data = in_obj
         else:
@@ -75,11 +249,35 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         session.add(db_obj)
+        await session.flush()
+        audit.record(
+            session,
+            "update",
+            self.model.__tablename__,
+            inspect(db_obj).identity[0],
+            before=before,
+            after=audit.snapshot(db_obj),
+        )
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
 
     async def delete(self, session: AsyncSession, db_obj: ModelType) -> Optional[ModelType]:
+        before = audit.snapshot(db_obj)
         await session.delete(db_obj)
+        # Leave a tombstone behind, so delta sync consumers learn about the delete
+        session.add(
+            Tombstone(
+                entity=self.model.__tablename__,
+                key=str(inspect(db_obj).identity[0]),
+            )
+        )
+        audit.record(
+            session,
+            "delete",
+            self.model.__tablename__,
+            inspect(db_obj).identity[0],
+            before=before,
+        )
         await session.commit()
         return db_obj
@@ -0,0 +1,68 @@
+from pydantic import BaseModel
+from sqlalchemy import and_, delete, exists, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import BranchStats, ChangeRequest
+from .base import BaseCRUD
+
+
+class BranchStatsCRUD(BaseCRUD[BranchStats, BaseModel, BaseModel]):
+    async def read_all(self, session: AsyncSession) -> list[BranchStats]:
+        # A primary key ordered scan, one row per branch, status and type
+        statement = (
+            select(self.model)
+            .where(self.model.count > 0)
+            .order_by(self.model.branch_id, self.model.status, self.model.type)
+        )
+        result = await session.execute(statement=statement)
+        return result.scalars().all()
+
+    async def reconcile(self, session: AsyncSession) -> int:
+        """
+        Recounts the change requests and repairs the counts which drifted (e.g. after a TRUNCATE or
+        a trigger disabled during a bulk load). The change requests are locked against writes until
+        the repair is committed, so no concurrent change is lost. Returns the number of repaired
+        counts.
+        """
+        await session.execute(text("LOCK TABLE change_request IN SHARE MODE"))
+        actual = select(
+            ChangeRequest.branch_id,
+            ChangeRequest.status,
+            ChangeRequest.type,
+            func.count().label("count"),
+        ).group_by(ChangeRequest.branch_id, ChangeRequest.status, ChangeRequest.type)
+        statement = insert(self.model).from_select(
+            ["branch_id", "status", "type", "count"], actual
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.branch_id, self.model.status, self.model.type],
+            set_={"count": statement.excluded.count},
+            where=self.model.count != statement.excluded.count,
+        ).returning(self.model.branch_id)
+        result = await session.execute(statement=statement)
+        repaired = len(result.all())
+
+        # The counts left are of change requests which don't exist anymore
+        statement = (
+            delete(self.model)
+            .where(
+                ~exists().where(
+                    and_(
+                        ChangeRequest.branch_id == self.model.branch_id,
+                        ChangeRequest.status == self.model.status,
+                        ChangeRequest.type == self.model.type,
+                    )
+                ),
+            )
+            .returning(self.model.count)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(statement=statement)
+        repaired += sum(count != 0 for count in result.scalars().all())
+        await session.commit()
+        return repaired
+
+
+branch_stats = BranchStatsCRUD(model=BranchStats)
@@ -1,17 +1,39 @@
-from typing import Optional
+from typing import Any, Optional, Sequence
 from uuid import UUID
 
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import update
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import distinct, func, lambda_stmt, or_, update
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select, StatementLambdaElement
 
+from app.enums import StatusEnum
 from app.models import ChangeRequest
 from app.schemas import ChangeRequestCreate, ChangeRequestUpdate
+from app.utils import audit
 from .base import BaseCRUD
 
 
+# The statuses a change request may move to, and the statuses it may move from (SAP's lifecycle)
+ALLOWED_TRANSITIONS: dict[StatusEnum, tuple[StatusEnum, ...]] = {
+    StatusEnum.modifiable: (StatusEnum.modifiable_protected,),
+    StatusEnum.modifiable_protected: (StatusEnum.modifiable,),
+    StatusEnum.release_standard: (StatusEnum.modifiable, StatusEnum.modifiable_protected),
+    StatusEnum.released: (
+        StatusEnum.modifiable,
+        StatusEnum.modifiable_protected,
+        StatusEnum.release_standard,
+    ),
+    StatusEnum.released_with_import_protection_for_repaired_objects: (
+        StatusEnum.modifiable,
+        StatusEnum.modifiable_protected,
+        StatusEnum.release_standard,
+    ),
+}
+
+
 class ChangeRequestCRUD(BaseCRUD[ChangeRequest, ChangeRequestCreate, ChangeRequestUpdate]):
     async def create(
         self,
@@ -22,30 +44,66 @@ class ChangeRequestCRUD(BaseCRUD[ChangeRequest, ChangeRequestCreate, ChangeReque
         in_obj_data = jsonable_encoder(in_obj)
         db_obj = self.model(**in_obj_data, branch_id=branch_id)
         session.add(db_obj)
+        await session.flush()
+        audit.record(
+            session, "create", self.model.__tablename__, db_obj.number, after=audit.snapshot(db_obj)
+        )
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
 
+    def read_with_branch_id_statement(
+        self,
+        obj_id: str,
+        branch_id: UUID,
+        fields: Optional[Sequence[str]] = None,
+    ) -> StatementLambdaElement:
+        model = self.model
+        statement = lambda_stmt(
+            lambda: select(model).where(model.number == obj_id, model.branch_id == branch_id)
+        )
+        return self.with_load_options(statement, fields)
+
     async def read_with_branch_id(
         self,
         session: AsyncSession,
         obj_id: str,
         branch_id: UUID,
+        coalesce: bool = False,
+        fields: Optional[Sequence[str]] = None,
     ) -> Optional[ChangeRequest]:
-        statement = select(self.model).where(
-            self.model.number == obj_id,
-            self.model.branch_id == branch_id,
+        async def execute(session: AsyncSession) -> Optional[ChangeRequest]:
+            statement = self.read_with_branch_id_statement(
+                obj_id=obj_id,
+                branch_id=branch_id,
+                fields=fields,
+            )
+            result = await session.execute(statement=statement)
+            return result.scalars().first()
+
+        if not coalesce:
+            return await execute(session)
+        return await self.read_coalesced(
+            session=session,
+            key=("read_with_branch_id", obj_id, branch_id, tuple(fields) if fields else None),
+            execute=execute,
         )
-        result = await session.execute(statement=statement)
-        return result.scalars().first()
 
     async def read_with_branch_id_or_404(
         self,
         session: AsyncSession,
         obj_id: str,
         branch_id: UUID,
+        coalesce: bool = False,
+        fields: Optional[Sequence[str]] = None,
     ) -> ChangeRequest:
-        db_obj = await self.read_with_branch_id(session=session, obj_id=obj_id, branch_id=branch_id)
+        db_obj = await self.read_with_branch_id(
+            session=session,
+            obj_id=obj_id,
+            branch_id=branch_id,
+            coalesce=coalesce,
+            fields=fields,
+        )
         if not db_obj:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -53,6 +111,15 @@ class ChangeRequestCRUD(BaseCRUD[ChangeRequest, ChangeRequestCreate, ChangeReque
             )
         return db_obj
 
+    async def read_numbers_by_branch(self, session: AsyncSession, branch_id: UUID) -> list[str]:
+        statement = (
+            select(self.model.number)
+            .where(self.model.branch_id == branch_id)
+            .order_by(self.model.created_at, self.model.number)
+        )
+        result = await session.execute(statement=statement)
+        return result.scalars().all()
+
     async def read_many_filter_by_branches(
         self,
         session: AsyncSession,
@@ -62,6 +129,91 @@ class ChangeRequestCRUD(BaseCRUD[ChangeRequest, ChangeRequestCreate, ChangeReque
         result = await session.execute(statement=statement)
         return result.scalars().all()
 
+    def diff_statement(self, branch_id: UUID, other_branch_id: UUID) -> Select:
+        """
+        Full join of both branches change requests by number, keeping the ones which are missing
+        from one of the branches or have different statuses.
+        """
+        branch = (
+            select(self.model.number, self.model.status)
+            .where(self.model.branch_id == branch_id)
+            .subquery("branch")
+        )
+        other = (
+            select(self.model.number, self.model.status)
+            .where(self.model.branch_id == other_branch_id)
+            .subquery("other")
+        )
+        number = func.coalesce(branch.c.number, other.c.number).label("number")
+        return (
+            select(
+                number,
+                branch.c.status.label("status"),
+                other.c.status.label("other_status"),
+            )
+            .select_from(branch.join(other, branch.c.number == other.c.number, full=True))
+            .where(
+                or_(
+                    branch.c.number.is_(None),
+                    other.c.number.is_(None),
+                    branch.c.status != other.c.status,
+                )
+            )
+            .order_by(number)
+        )
+
+    async def diff(self, session: AsyncSession, branch_id: UUID, other_branch_id: UUID) -> list[Any]:
+        statement = self.diff_statement(branch_id=branch_id, other_branch_id=other_branch_id)
+        result = await session.execute(statement=statement)
+        return result.all()
+
+    async def stream_diff(
+        self,
+        session: AsyncSession,
+        branch_id: UUID,
+        other_branch_id: UUID,
+    ) -> AsyncResult:
+        statement = self.diff_statement(branch_id=branch_id, other_branch_id=other_branch_id)
+        return await session.stream(statement=statement)
+
+    async def diff_many(self, session: AsyncSession, branches_ids: list[UUID]) -> list[Any]:
+        """
+        Finds the change requests which are missing from some of the branches or have different
+        statuses across them, with their status per branch.
+        """
+        statement = (
+            select(
+                self.model.number,
+                func.array_agg(self.model.branch_id).label("branches_ids"),
+                func.array_agg(self.model.status).label("statuses"),
+            )
+            .where(self.model.branch_id.in_(branches_ids))
+            .group_by(self.model.number)
+            .having(
+                or_(
+                    func.count() < len(set(branches_ids)),
+                    func.count(distinct(self.model.status)) > 1,
+                )
+            )
+            .order_by(self.model.number)
+        )
+        result = await session.execute(statement=statement)
+        return result.all()
+
+    def bulk_update_branch_id_statement(
+        self,
+        source_branch_id: UUID,
+        target_branch_id: UUID,
+        objs_ids: list[str],
+    ) -> StatementLambdaElement:
+        model = self.model
+        return lambda_stmt(
+            lambda: update(model)
+            .where(model.number.in_(objs_ids), model.branch_id == source_branch_id)
+            .values(branch_id=target_branch_id)
+            .returning(model.number)
+        )
+
     async def bulk_update_branch_id(
         self,
         session: AsyncSession,
@@ -69,16 +221,73 @@ class ChangeRequestCRUD(BaseCRUD[ChangeRequest, ChangeRequestCreate, ChangeReque
         target_branch_id: UUID,
         objs_ids: list[str],
     ) -> None:
+        statement = self.bulk_update_branch_id_statement(
+            source_branch_id=source_branch_id,
+            target_branch_id=target_branch_id,
+            objs_ids=objs_ids,
+        )
+        result = await session.execute(statement=statement)
+        for number in result.scalars().all():
+            audit.record(
+                session,
+                "move",
+                self.model.__tablename__,
+                number,
+                before={"branch_id": str(source_branch_id)},
+                after={"branch_id": str(target_branch_id)},
+            )
+        await session.commit()
+
+    async def bulk_transition_status(
+        self,
+        session: AsyncSession,
+        branch_id: UUID,
+        objs_ids: list[str],
+        status: StatusEnum,
+    ) -> tuple[list[str], list[Any]]:
+        """
+        Moves the change requests to the status in a single UPDATE, the state machine is enforced
+        by its WHERE clause. Returns the moved numbers and the (number, status) of the ones which
+        were not allowed to move (their status is read only when there are such).
+        """
+        # Joined to itself, the FROM side still holds the rows as they were before the update
+        previous = aliased(self.model)
         statement = (
             update(self.model)
             .where(
+                self.model.number == previous.number,
+                self.model.branch_id == previous.branch_id,
+                self.model.branch_id == branch_id,
                 self.model.number.in_(objs_ids),
-                self.model.branch_id == source_branch_id,
+                self.model.status.in_(ALLOWED_TRANSITIONS[status]),
             )
-            .values(branch_id=target_branch_id)
+            .values(status=status)
+            .returning(self.model.number, previous.status)
+            .execution_options(synchronize_session=False)
         )
-        await session.execute(statement=statement)
+        result = await session.execute(statement=statement)
+        transitioned = []
+        for number, previous_status in result.all():
+            transitioned.append(number)
+            audit.record(
+                session,
+                "update",
+                self.model.__tablename__,
+                number,
+                before={"status": previous_status.value},
+                after={"status": status.value},
+            )
         await session.commit()
 
+        rejected_ids = set(objs_ids).difference(transitioned)
+        if not rejected_ids:
+            return transitioned, []
+        statement = select(self.model.number, self.model.status).where(
+            self.model.branch_id == branch_id,
+            self.model.number.in_(rejected_ids),
+        )
+        result = await session.execute(statement=statement)
+        return transitioned, result.all()
+
 
 change_request = ChangeRequestCRUD(model=ChangeRequest)
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Iterable, Optional, Sequence
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import delete, func, insert, literal, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
+
+from app.enums import StatusEnum
+from app.models import ChangeRequest, ChangeRequestArchive, Tombstone
+from .base import BaseCRUD
+
+# Released change requests can't be changed anymore, so they are the ones moved to the archive
+ARCHIVED_STATUSES = (
+    StatusEnum.released,
+    StatusEnum.released_with_import_protection_for_repaired_objects,
+)
+ARCHIVED_COLUMNS = ("number", "type", "description", "status", "created_at", "branch_id")
+
+
+class ChangeRequestArchiveCRUD(BaseCRUD[ChangeRequestArchive, BaseModel, BaseModel]):
+    async def read_many_by_branch(
+        self,
+        session: AsyncSession,
+        branch_id: UUID,
+    ) -> list[ChangeRequestArchive]:
+        statement = (
+            select(self.model)
+            .where(self.model.branch_id == branch_id)
+            .order_by(self.model.created_at, self.model.number)
+        )
+        result = await session.execute(statement=statement)
+        return result.scalars().all()
+
+    async def read_with_branch_id(
+        self,
+        session: AsyncSession,
+        obj_id: str,
+        branch_id: UUID,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[ChangeRequestArchive]:
+        statement = (
+            select(self.model)
+            .where(self.model.number == obj_id, self.model.branch_id == branch_id)
+            .options(*self.load_options(fields))
+        )
+        result = await session.execute(statement=statement)
+        return result.scalars().first()
+
+    def archivable(self, before: datetime) -> Select:
+        return select(ChangeRequest.number).where(
+            ChangeRequest.status.in_(ARCHIVED_STATUSES),
+            ChangeRequest.created_at < before,
+        )
+
+    async def create_partitions(
+        self,
+        session: AsyncSession,
+        months: Iterable[datetime],
+    ) -> list[str]:
+        """
+        Creates the monthly partitions (`months` are their starts) which don't exist yet, returns
+        the names of the created ones.
+        """
+        partitions = []
+        for start in sorted(set(months)):
+            partition = f"{self.model.__tablename__}_y{start.year}m{start.month:02}"
+            exists = await session.execute(text("SELECT to_regclass(:name)"), {"name": partition})
+            if exists.scalar_one() is not None:
+                continue
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+            await session.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF "
+                    f"{self.model.__tablename__} FOR VALUES FROM ('{start.isoformat()}') "
+                    f"TO ('{end.isoformat()}')"
+                )
+            )
+            partitions.append(partition)
+        return partitions
+
+    async def archive_batch(self, session: AsyncSession, before: datetime, size: int) -> list[str]:
+        """
+        Moves up to `size` released change requests created before `before` to the archive, in a
+        single statement (DELETE ... RETURNING feeding the INSERTs). The batch is locked first and
+        the partitions of its months created in the same transaction, a change request released
+        while the job runs may belong to a month which had none.
+
+        Each moved change request leaves a tombstone, as a delete does, so the delta sync consumers
+        learn it left the live set. Its objects (change_request_object) are deliberately not kept:
+        the delete cascades to them, they only serve the conflicts and import plans of the live
+        change requests, and a released change request is already imported.
+        """
+        month = func.date_trunc("month", ChangeRequest.created_at)
+        batch = await session.execute(
+            self.archivable(before=before)
+            .add_columns(month)
+            .limit(size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = batch.all()
+        await self.create_partitions(session=session, months=[start for _, start in rows])
+        moved = (
+            delete(ChangeRequest)
+            .where(ChangeRequest.number.in_([number for number, _ in rows]))
+            .returning(*(getattr(ChangeRequest, column) for column in ARCHIVED_COLUMNS))
+            .cte("moved")
+        )
+        archived = (
+            insert(self.model)
+            .from_select(
+                ARCHIVED_COLUMNS,
+                select(*(moved.c[column] for column in ARCHIVED_COLUMNS)),
+            )
+            .returning(self.model.number)
+            .cte("archived")
+        )
+        statement = (
+            insert(Tombstone)
+            .from_select(
+                ["entity", "key"],
+                select(literal(ChangeRequest.__tablename__), archived.c.number),
+            )
+            .returning(Tombstone.key)
+        )
+        result = await session.execute(statement=statement)
+        numbers = result.scalars().all()
+        await session.commit()
+        return numbers
+
+change_request_archive = ChangeRequestArchiveCRUD(model=ChangeRequestArchive)
@@ -0,0 +1,117 @@
+from typing import Any
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
+
+from app.db import insert_many
+from app.models import ChangeRequest, ChangeRequestObject
+from app.schemas import ChangeRequestObjectCreate
+from .base import BaseCRUD
+
+
+
+class ChangeRequestObjectCRUD(
+    BaseCRUD[ChangeRequestObject, ChangeRequestObjectCreate, ChangeRequestObjectCreate]
+):
+    async def read_many_by_change_request(
+        self,
+        session: AsyncSession,
+        change_request_number: str,
+    ) -> list[ChangeRequestObject]:
+        statement = (
+            select(self.model)
+            .where(self.model.change_request_number == change_request_number)
+            .order_by(self.model.pgmid, self.model.object_type, self.model.object_name)
+        )
+        result = await session.execute(statement=statement)
+        return result.scalars().all()
+
+    async def replace_many(
+        self,
+        session: AsyncSession,
+        change_request_number: str,
+        in_objs: list[ChangeRequestObjectCreate],
+    ) -> None:
+        """
+        Replaces the indexed content of a change request with multi-row inserts.
+        """
+        await session.execute(
+            delete(self.model).where(self.model.change_request_number == change_request_number)
+        )
+        rows = [
+            {**jsonable_encoder(in_obj), "change_request_number": change_request_number}
+            for in_obj in in_objs
+        ]
+        await insert_many(session, self.model, rows, on_conflict_do_nothing=True)
+        await session.commit()
+
+    async def read_conflicts(self, session: AsyncSession, branch_id: UUID) -> list[Any]:
+        """
+        Finds the objects of the branch's change requests which are transported by other change
+        requests too (of any branch), joining through the object index instead of comparing pairs.
+        """
+        branch_object = aliased(self.model)
+        branch_change_request = aliased(ChangeRequest)
+        branch_objects = (
+            select(branch_object.pgmid, branch_object.object_type, branch_object.object_name)
+            .join(
+                branch_change_request,
+                branch_change_request.number == branch_object.change_request_number,
+            )
+            .where(branch_change_request.branch_id == branch_id)
+        )
+        object_key = (self.model.pgmid, self.model.object_type, self.model.object_name)
+        statement = (
+            select(
+                *object_key,
+                func.array_agg(self.model.change_request_number).label("numbers"),
+                func.array_agg(ChangeRequest.branch_id).label("branches_ids"),
+            )
+            .join(ChangeRequest, ChangeRequest.number == self.model.change_request_number)
+            .where(tuple_(*object_key).in_(branch_objects))
+            .group_by(*object_key)
+            .having(func.count() > 1)
+            .order_by(*object_key)
+        )
+        result = await session.execute(statement=statement)
+        return result.all()
+
+    async def read_import_dependencies(
+        self,
+        session: AsyncSession,
+        branch_id: UUID,
+    ) -> list[Any]:
+        """
+        Pairs each change request of the branch with the previous one (by creation) that
+        transports the same object, only the nearest predecessor per object is needed since the
+        earlier ones are reached through it.
+        """
+        object_key = (self.model.pgmid, self.model.object_type, self.model.object_name)
+        predecessors = (
+            select(
+                self.model.change_request_number.label("number"),
+                func.lag(self.model.change_request_number)
+                .over(
+                    partition_by=object_key,
+                    order_by=(ChangeRequest.created_at, ChangeRequest.number),
+                )
+                .label("depends_on"),
+            )
+            .join(ChangeRequest, ChangeRequest.number == self.model.change_request_number)
+            .where(ChangeRequest.branch_id == branch_id)
+            .subquery()
+        )
+        statement = (
+            select(predecessors.c.number, predecessors.c.depends_on)
+            .where(predecessors.c.depends_on.is_not(None))
+            .distinct()
+        )
+        result = await session.execute(statement=statement)
+        return result.all()
+
+
+change_request_object = ChangeRequestObjectCRUD(model=ChangeRequestObject)
@@ -0,0 +1,80 @@
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Branch, ChangeRequest, Tombstone
+
+
+TRACKED_TABLES = [model.__tablename__ for model in (Branch, ChangeRequest, Tombstone)]
+
+# The in flight transactions (ids as numbers, see app/models/base.py) which may have written
+# tracked rows: still running and holding a write lock on a tracked table of this database, or
+# finished and their rows are there. The others (read only, other databases) don't matter
+WRITERS = text(
+    """
+    SELECT writer.id FROM unnest(CAST(:in_flight AS BIGINT[])) AS writer(id)
+    WHERE CASE
+    WHEN pg_xact_status(CAST(CAST(writer.id AS TEXT) AS XID8)) = 'in progress' THEN EXISTS (
+        SELECT FROM pg_locks AS transaction
+        JOIN pg_locks AS relation USING (virtualtransaction)
+        WHERE transaction.locktype = 'transactionid'
+            AND CAST(CAST(transaction.transactionid AS TEXT) AS BIGINT) = writer.id % 4294967296
+            AND relation.locktype = 'relation'
+            AND relation.database = (SELECT oid FROM pg_database WHERE datname = current_database())
+            AND relation.relation = ANY(CAST(CAST(:tables AS TEXT[]) AS REGCLASS[]))
+            AND relation.mode NOT IN ('AccessShareLock', 'RowShareLock')
+    ) ELSE {committed} END
+    ORDER BY writer.id
+    """.format(
+        committed=" OR ".join(
+            f"EXISTS (SELECT FROM {table} WHERE transaction_id = writer.id)"
+            for table in TRACKED_TABLES
+        )
+    )
+)
+
+
+class Snapshot(NamedTuple):
+    # The first transaction id not yet assigned, and the ones still running (except ours)
+    xmax: int
+    in_flight: list[int]
+
+
+class ChangeTracking:
+    """
+    Finds the transactions whose tracked writes a delta sync can't see yet, the sync token keeps
+    them so the next sync returns their rows once committed (see app/routers/changes.py).
+    """
+
+    async def read_snapshot(self, session: AsyncSession) -> Snapshot:
+        """
+        Returns the transactions running now, to be read before the rows.
+        """
+        result = await session.execute(
+            text(
+                "SELECT CAST(pg_current_snapshot() AS TEXT), "
+                "CAST(pg_current_xact_id_if_assigned() AS TEXT)"
+            )
+        )
+        snapshot, own = result.one()
+        # Formatted as xmin:xmax:xip1,xip2,...
+        _, xmax, in_flight = snapshot.split(":")
+        ids = [int(id) for id in in_flight.split(",") if id and id != own]
+        return Snapshot(xmax=int(xmax), in_flight=ids)
+
+    async def in_flight_writers(self, session: AsyncSession, snapshot: Snapshot) -> list[int]:
+        """
+        Returns the transactions running at `snapshot` which may have written tracked rows the
+        reads after it didn't see, to be called after them. The transactions which started later
+        (from `snapshot.xmax`) are not listed, they all count.
+        """
+        if not snapshot.in_flight:
+            return []
+        result = await session.execute(
+            WRITERS, {"in_flight": snapshot.in_flight, "tables": TRACKED_TABLES}
+        )
+        return result.scalars().all()
+
+
+change_tracking = ChangeTracking()
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import delete, func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import SapContent
+from .base import BaseCRUD
+
+
+# Fraction of the TTL accessed_at may lag behind, before a cache hit updates it
+ACCESS_PRECISION = 0.1
+
+class SapContentCRUD(BaseCRUD[SapContent, BaseModel, BaseModel]):
+    async def read_fresh(
+        self,
+        session: AsyncSession,
+        change_request_number: str,
+        ttl: timedelta,
+    ) -> Optional[bytes]:
+        """
+        Reads the cached content unless it expired, and marks modifiable content as used (for the
+        LRU eviction) when it was last marked more than a tenth of `ttl` ago: the eviction doesn't
+        need it more precise, and most hits stay a single read.
+        """
+        statement = select(
+            self.model.content,
+            ~self.model.immutable & (self.model.accessed_at <= func.now() - ttl * ACCESS_PRECISION),
+        ).where(
+            self.model.change_request_number == change_request_number,
+            or_(self.model.immutable, self.model.fetched_at > func.now() - ttl),
+        )
+        result = await session.execute(statement=statement)
+        row = result.first()
+        if row is None:
+            return None
+        content, touch = row
+        if touch:
+            await session.execute(
+                update(self.model)
+                .where(self.model.change_request_number == change_request_number)
+                .values(accessed_at=func.now()),
+                execution_options={"synchronize_session": False},
+            )
+            await session.commit()
+        return content
+
+    async def store(
+        self,
+        session: AsyncSession,
+        change_request_number: str,
+        content: bytes,
+        immutable: bool,
+    ) -> None:
+        values = {"content": content, "size": len(content), "immutable": immutable}
+        statement = insert(self.model).values(change_request_number=change_request_number, **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.change_request_number],
+            set_={**values, "fetched_at": func.now(), "accessed_at": func.now()},
+        )
+        await session.execute(statement=statement)
+        await session.commit()
+
+    async def evict(self, session: AsyncSession, ttl: timedelta, max_bytes: int) -> int:
+        """
+        Deletes the expired modifiable content, and the least recently used modifiable content
+        beyond `max_bytes` (in one statement, with a running total of the sizes).
+        """
+        running = (
+            select(
+                self.model.change_request_number,
+                func.sum(self.model.size)
+                .over(order_by=(self.model.accessed_at.desc(), self.model.change_request_number))
+                .label("total"),
+            )
+            .where(~self.model.immutable)
+            .subquery()
+        )
+        over_budget = select(running.c.change_request_number).where(running.c.total > max_bytes)
+        statement = delete(self.model).where(
+            ~self.model.immutable,
+            or_(
+                self.model.fetched_at <= func.now() - ttl,
+                self.model.change_request_number.in_(over_budget),
+            ),
+        )
+        result = await session.execute(
+            statement=statement,
+            execution_options={"synchronize_session": False},
+        )
+        await session.commit()
+        return result.rowcount
+
+    async def read_sizes(self, session: AsyncSession) -> dict[bool, int]:
+        """
+        Returns the total size of the cached content, by immutability.
+        """
+        statement = select(self.model.immutable, func.sum(self.model.size)).group_by(
+            self.model.immutable
+        )
+        result = await session.execute(statement=statement)
+        return {immutable: size for immutable, size in result.all()}
+
+
+sap_content = SapContentCRUD(model=SapContent)
@@ -0,0 +1,10 @@
+from app.models import Tombstone
+from app.schemas import Tombstone as TombstoneSchema
+from .base import BaseCRUD
+
+
+class TombstoneCRUD(BaseCRUD[Tombstone, TombstoneSchema, TombstoneSchema]):
+    pass
+
+
+tombstone = TombstoneCRUD(model=Tombstone)
@@ -1,13 +1,84 @@
 """
 Sets up postgres connection pool.
+
+A session checks out a connection from the pool on its first statement only (not when created),
+and gives it back when its transaction ends (commit, rollback or close).
 """
 
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 
 
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URL, future=True, echo=False)
+engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URL,
+    future=True,
+    echo=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    # asyncpg prepares each statement once per connection, and reuses it from this cache
+    connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+)
 
 async_session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+# PostgreSQL's limit of bound parameters per statement (their count is a 16 bits integer)
+MAX_BIND_PARAMETERS = 32767
+
+
+class BatchSession(AsyncSession):
+    """
+    Session whose commits only flush, so many CRUD operations share a single transaction which is
+    committed at once by `commit_batch`.
+    """
+
+    async def commit(self) -> None:
+        await self.flush()
+
+    async def commit_batch(self) -> None:
+        await super().commit()
+
+
+batch_session = sessionmaker(engine, expire_on_commit=False, class_=BatchSession)
+
+
+@asynccontextmanager
+async def outside_transaction(session: AsyncSession) -> AsyncIterator[None]:
+    """
+    Ends (commits) the session's transaction, so its connection goes back to the pool while the
+    block does external I/O (e.g. calls SAP). The next statement checks out a connection again.
+    In a batch the commit is a flush, the batch transaction is kept.
+    """
+    if session.in_transaction():
+        await session.commit()
+    yield
+
+
+async def insert_many(
+    session: AsyncSession,
+    model: Any,
+    rows: list[dict[str, Any]],
+    returning: Optional[Any] = None,
+    on_conflict_do_nothing: bool = False,
+) -> list[Any]:
+    """
+    Inserts the rows with multi-row INSERTs, as many rows per statement as the bound parameters
+    limit allows for the table's column count. Returns the `returning` column values, if any.
+    """
+    size = max(MAX_BIND_PARAMETERS // len(model.__table__.columns), 1)
+    returned = []
+    for start in range(0, len(rows), size):
+        statement = insert(model).values(rows[start : start + size])
+        if on_conflict_do_nothing:
+            statement = statement.on_conflict_do_nothing()
+        if returning is not None:
+            result = await session.execute(statement=statement.returning(returning))
+            returned += result.scalars().all()
+        else:
+            await session.execute(statement=statement)
+    return returned
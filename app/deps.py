@@ -1,6 +1,13 @@
+import functools
+from typing import Any, Callable, Optional, Type
+
+from fastapi import HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import async_session
+from app.db import BatchSession, async_session, batch_session
 
 
 async def get_session() -> AsyncSession:
@@ -9,3 +16,71 @@ async def get_session() -> AsyncSession:
         yield session
     finally:
         await session.close()
+
+
+class SessionRoute(APIRoute):
+    """
+    Closes the route's session as soon as the endpoint returns, so its connection goes back to the
+    pool before the response is serialized and sent (the `get_session` teardown runs only after
+    the response was sent). The returned objects are detached, with their loaded attributes.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        call = self.dependant.call
+
+        async def close_sessions(values: dict[str, Any]) -> None:
+            for value in values.values():
+                if isinstance(value, AsyncSession) and not isinstance(value, BatchSession):
+                    await value.close()
+
+        @functools.wraps(call)
+        async def call_and_close_session(**values: Any) -> Any:
+            try:
+                response = await call(**values)
+            except Exception:
+                await close_sessions(values)
+                raise
+            # A streamed response still reads from the session, it's closed by the teardown
+            if not isinstance(response, StreamingResponse):
+                await close_sessions(values)
+            return response
+
+        self.dependant.call = call_and_close_session
+
+
+async def get_batch_session() -> BatchSession:
+    session = batch_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def get_fields(schema: Type[BaseModel]) -> Callable[[Optional[str]], Optional[list[str]]]:
+    """
+    Parses the `fields` query parameter (sparse fieldsets), a comma separated list of the schema
+    fields to return. None means all of them.
+    """
+
+    def parse_fields(
+        fields: Optional[str] = Query(
+            default=None,
+            description=f"Comma separated fields to return, out of: {', '.join(schema.__fields__)}",
+        ),
+    ) -> Optional[list[str]]:
+        if fields is None:
+            return None
+        requested = list(dict.fromkeys(filter(None, (field.strip() for field in fields.split(",")))))
+        unknown = [field for field in requested if field not in schema.__fields__]
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "loc": ["query", "fields"],
+                    "msg": f"unknown fields: {unknown}" if unknown else "no fields requested",
+                },
+            )
+        return requested
+
+    return parse_fields
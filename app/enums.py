@@ -0,0 +1,19 @@
+"""
+Enumerations shared by the models (database) and the schemas (API), SAP's one letter codes.
+"""
+
+from enum import Enum
+
+
+class StatusEnum(str, Enum):
+    modifiable = "D"
+    modifiable_protected = "L"
+    release_standard = "O"
+    released = "R"
+    released_with_import_protection_for_repaired_objects = "N"
+
+
+class TypeEnum(str, Enum):
+    workbench = "K"
+    customizing = "W"
+    transport_of_copies = "T"
@@ -0,0 +1,3 @@
+"""
+Maintenance jobs, run outside of the API workers (e.g. by cron): `python -m app.jobs.<job>`.
+"""
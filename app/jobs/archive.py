@@ -0,0 +1,53 @@
+"""
+Moves the released change requests out of the hot `change_request` table into the partitioned
+`change_request_archive`, in batches, so the hot table and its indexes stay small.
+
+Usage: python -m app.jobs.archive
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.config import settings
+from app.db import async_session, engine
+
+
+logger = logging.getLogger(__name__)
+
+
+async def archive_change_requests(session: AsyncSession, before: datetime, batch_size: int) -> int:
+    """
+    Archives the released change requests created before `before`, one committed batch at a time
+    (short transactions, the API keeps working meanwhile). Returns the number of archived ones.
+    """
+    archived = 0
+    while True:
+        numbers = await crud.change_request_archive.archive_batch(
+            session=session,
+            before=before,
+            size=batch_size,
+        )
+        archived += len(numbers)
+        if len(numbers) < batch_size:
+            return archived
+
+
+async def main() -> None:
+    before = datetime.now(tz=timezone.utc) - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    async with async_session() as session:
+        archived = await archive_change_requests(
+            session=session,
+            before=before,
+            batch_size=settings.ARCHIVE_BATCH_SIZE,
+        )
+    await engine.dispose()
+    logger.info("Archived %d change requests created before %s", archived, before)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+"""
+Repairs the per branch change request counts (`branch_stats`) which drifted from the change
+requests, the triggers keep them up to date otherwise.
+
+Usage: python -m app.jobs.branch_stats
+"""
+
+import asyncio
+import logging
+
+from app import crud
+from app.db import async_session, engine
+
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    async with async_session() as session:
+        repaired = await crud.branch_stats.reconcile(session=session)
+    await engine.dispose()
+    logger.info("Repaired %d branch stats counts", repaired)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Defines the application startup and shutdown handlers.
+
+Startup warms the worker up (database pool, hot statements and SAP client), so the first requests
+after a deploy don't pay for it. Shutdown flushes the audit log and closes the connections.
+
+The server drains the requests itself: on SIGTERM it stops accepting connections and waits for the
+in-flight requests (up to SERVER_GRACEFUL_TIMEOUT under gunicorn) before running the shutdown.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import IMPORT_STARTED_AT, crud
+from app.config import settings
+from app.db import engine
+from app.utils.audit import audit_writer
+
+
+# Logged through uvicorn's logger, so the messages end up in the server logs
+logger = logging.getLogger("uvicorn.error")
+
+NIL_UUID = UUID(int=0)
+
+
+@contextmanager
+def profile(step: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    yield
+    if settings.STARTUP_PROFILE:
+        logger.info("Startup profile: %s took %.3fs", step, time.perf_counter() - started_at)
+
+
+async def warm_up_pool(size: int) -> None:
+    # Connections are checked out together, otherwise the pool would hand out the same one each time
+    connections = await asyncio.gather(*(engine.connect() for _ in range(size)))
+    try:
+        for connection in connections:
+            # Running the hot statements fills both SQLAlchemy's compiled cache and the connection's
+            # asyncpg prepared statements cache
+            async with AsyncSession(bind=connection) as session:
+                await crud.branch.read(session=session, obj_id=NIL_UUID)
+                await crud.change_request.read_with_branch_id(
+                    session=session,
+                    obj_id="",
+                    branch_id=NIL_UUID,
+                )
+    finally:
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+
+async def warm_up_sap() -> None:
+    # Imported lazily, the SAP client (and httpx) is only loaded when the integration is enabled
+    from httpx import HTTPError
+
+    from app.utils import sap
+
+    try:
+        await sap.warm_up()
+    except HTTPError as error:
+        logger.warning("SAP client warm up failed: %r", error)
+
+
+async def startup() -> None:
+    if settings.STARTUP_PROFILE:
+        logger.info(
+            "Startup profile: importing the application took %.3fs",
+            time.perf_counter() - IMPORT_STARTED_AT,
+        )
+    with profile("database pool warm up"):
+        await warm_up_pool(size=min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE))
+    if settings.SAP_AUTH_URL:
+        with profile("SAP client warm up"):
+            await warm_up_sap()
+    audit_writer.start()
+
+
+async def shutdown() -> None:
+    await audit_writer.stop()
+    if "app.utils.sap" in sys.modules:
+        await sys.modules["app.utils.sap"].close_client()
+    await engine.dispose()
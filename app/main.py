@@ -1,22 +1,81 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app import lifespan
 from app.config import settings
-from app.routers import branch, change_request
+from app.db import engine
+from app.middleware import (
+    AdmissionMiddleware,
+    CompressionMiddleware,
+    ConcurrencyLimit,
+    ContentNegotiationMiddleware,
+    ProfilingMiddleware,
+    TokenBucket,
+    track_sql_timings,
+)
+from app.routers import audit, batch, branch, change_request, changes, metrics
+from app.utils.resilience import CircuitOpenError
+
 
+app = FastAPI(on_startup=[lifespan.startup], on_shutdown=[lifespan.shutdown])
 
-app = FastAPI()
+# The response is encoded in the negotiated format first, then compressed
+app.add_middleware(ContentNegotiationMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
 
+app.add_middleware(
+    AdmissionMiddleware,
+    reads=ConcurrencyLimit(
+        name="reads",
+        limit=settings.ADMISSION_MAX_READS,
+        queue_size=settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    ),
+    writes=ConcurrencyLimit(
+        name="writes",
+        limit=settings.ADMISSION_MAX_WRITES,
+        queue_size=settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    ),
+    rate_limit=TokenBucket(rate=settings.RATE_LIMIT_RATE, burst=settings.RATE_LIMIT_BURST)
+    if settings.RATE_LIMIT_RATE
+    else None,
+)
+if settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_EVERY:
+    track_sql_timings(engine.sync_engine)
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILING_DIR,
+        token=settings.PROFILING_TOKEN,
+        sample_every=settings.PROFILING_SAMPLE_EVERY,
+    )
+# Added last so it wraps all the others: their rejections (429, 503) get the CORS headers too,
+# and browsers can read when to retry
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=settings.CORS_CREDENTIALS,
     allow_methods=settings.CORS_METHODS,
     allow_headers=settings.CORS_HEADERS,
+    expose_headers=["Retry-After"],
 )
 
 app.include_router(router=branch.router, tags=["branches"])
 app.include_router(router=change_request.router, tags=["change-requests"])
+app.include_router(router=changes.router, tags=["changes"])
+app.include_router(router=batch.router, tags=["batch"])
+app.include_router(router=metrics.router, tags=["metrics"])
+app.include_router(router=audit.router, tags=["audit"])
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, error: CircuitOpenError) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(error)},
+        headers={"Retry-After": str(max(int(error.retry_after), 1))},
+    )
 
 
 @app.get("/")
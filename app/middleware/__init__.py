@@ -0,0 +1,4 @@
+from .admission import AdmissionMiddleware, ConcurrencyLimit, TokenBucket
+from .profiling import ProfilingMiddleware, track_sql_timings, untrack_sql_timings
+from .negotiation import ContentNegotiationMiddleware
+from .compression import CompressionMiddleware
@@ -0,0 +1,162 @@
+"""
+Admission control: caps the concurrent requests of the worker and sheds the excess early, so a load
+spike fails fast with 503 instead of queueing every request for a database connection until the
+clients time out.
+
+Reads and writes are limited separately (a burst of reads can't starve the writes), requests over
+the limit wait in a bounded queue for up to a deadline. Clients are rate limited with token buckets.
+"""
+
+import asyncio
+import math
+import time
+from typing import Callable, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.metrics import metrics
+
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ConcurrencyLimit:
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float) -> None:
+        self.name = name
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> bool:
+        """
+        Returns False when the request is shed: the queue is full, or its deadline expired.
+        """
+        if self._semaphore.locked():
+            if self.queued >= self.queue_size:
+                metrics.increment(f"admission_{self.name}_shed")
+                return False
+            self.queued += 1
+            metrics.increment(f"admission_{self.name}_queued")
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                metrics.increment(f"admission_{self.name}_shed")
+                return False
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        metrics.increment(f"admission_{self.name}_admitted")
+        metrics.set(f"admission_{self.name}_in_flight", self.in_flight)
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        metrics.set(f"admission_{self.name}_in_flight", self.in_flight)
+        self._semaphore.release()
+
+
+class TokenBucket:
+    """
+    Per client token buckets, each holding up to `burst` tokens and refilled at `rate` per second.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_clients: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def take(self, client: str) -> float:
+        """
+        Takes a token of the client, returns 0 when allowed or the seconds until a token is back.
+        """
+        now = self.clock()
+        tokens, updated_at = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        if tokens < 1:
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+        if client not in self._buckets and len(self._buckets) >= self.max_clients:
+            self._forget_full_buckets(now)
+        self._buckets[client] = (tokens - 1, now)
+        return 0
+
+    def _forget_full_buckets(self, now: float) -> None:
+        # A full bucket is the same as no bucket, so the idle clients are dropped
+        self._buckets = {
+            client: (tokens, updated_at)
+            for client, (tokens, updated_at) in self._buckets.items()
+            if tokens + (now - updated_at) * self.rate < self.burst
+        }
+
+
+def client_key(scope: Scope) -> str:
+    # The headers are set by the clients, so X-Forwarded-For is only trusted when the server
+    # rewrote the client from it (the proxies in SERVER_FORWARDED_ALLOW_IPS)
+    client = scope.get("client")
+    return client[0] if client else ""
+
+
+class AdmissionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        reads: ConcurrencyLimit,
+        writes: ConcurrencyLimit,
+        rate_limit: Optional[TokenBucket] = None,
+        exempt_paths: tuple[str, ...] = ("/ping", "/metrics"),
+    ) -> None:
+        self.app = app
+        self.reads = reads
+        self.writes = writes
+        self.rate_limit = rate_limit
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        if self.rate_limit is not None:
+            retry_after = self.rate_limit.take(client_key(scope))
+            if retry_after:
+                metrics.increment("admission_rate_limited")
+                await self.reject(
+                    scope, receive, send, status.HTTP_429_TOO_MANY_REQUESTS, retry_after
+                )
+                return
+
+        limit = self.reads if scope["method"] in READ_METHODS else self.writes
+        if not await limit.acquire():
+            await self.reject(
+                scope, receive, send, status.HTTP_503_SERVICE_UNAVAILABLE, limit.queue_timeout
+            )
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+    @staticmethod
+    async def reject(
+        scope: Scope, receive: Receive, send: Send, status_code: int, retry_after: float
+    ) -> None:
+        response = JSONResponse(
+            content={"detail": "Too many requests, try again later"},
+            status_code=status_code,
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,160 @@
+"""
+Compresses the responses with the best encoding the client accepts (`Accept-Encoding`): zstd, br
+then gzip. Responses smaller than `minimum_size` are sent as is, compressing them costs more than
+it saves.
+"""
+
+import zlib
+from typing import Optional, Protocol
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.negotiation import parse_quality
+from app.utils.metrics import metrics
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def sync_flush(self) -> bytes:
+        """
+        Returns the pending output, so what was compressed so far can be decompressed.
+        """
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+
+class GzipCompressor:
+    def __init__(self) -> None:
+        # wbits 31 writes the gzip header and trailer
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def sync_flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self) -> None:
+        # The high qualities are meant for static content, too slow for every response
+        self._compressor = brotli.Compressor(quality=5)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def sync_flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def sync_flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+# In the order of preference
+ENCODINGS: dict[str, type[Compressor]] = {
+    "zstd": ZstdCompressor,
+    "br": BrotliCompressor,
+    "gzip": GzipCompressor,
+}
+
+
+def choose_encoding(accept_encoding: str, encodings: tuple[str, ...]) -> Optional[str]:
+    qualities = dict(parse_quality(accept_encoding))
+    for encoding in encodings:
+        if qualities.get(encoding, qualities.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: Optional[tuple[str, ...]] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        # Unknown encodings are skipped
+        self.encodings = tuple(
+            encoding for encoding in encodings or tuple(ENCODINGS) if encoding in ENCODINGS
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[Compressor] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk tells whether it's worth compressing
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                if "content-encoding" in headers or (
+                    not more_body and len(body) < self.minimum_size
+                ):
+                    await send(start)
+                    await send(message)
+                    start = None
+                    return
+                compressor = ENCODINGS[encoding]()
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                metrics.increment(f"responses_{encoding}")
+                if not more_body:
+                    body = compressor.compress(body) + compressor.flush()
+                    headers["content-length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                # Streamed responses are compressed chunk by chunk, their length is unknown
+                del headers["content-length"]
+                await send(start)
+
+            # Each chunk is flushed, a streamed response (NDJSON) reaches the client as it goes
+            # instead of when the compressor's buffer fills up
+            body = compressor.compress(body)
+            body += compressor.sync_flush() if more_body else compressor.flush()
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
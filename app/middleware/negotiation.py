@@ -0,0 +1,131 @@
+"""
+Content negotiation: JSON responses are sent in the more compact format the client asks for in
+its `Accept` header, on every route.
+
+- `application/msgpack`: the same document, encoded as MessagePack.
+- `application/vnd.columnar+json`: every list of objects becomes
+  `{"columns": [...], "rows": [[...]]}` (a missing field is null), so the field names of list
+  endpoints (and of the nested change requests) are sent once instead of once per item.
+
+Clients which don't ask for them (or prefer JSON) get JSON as before.
+"""
+
+import json
+from typing import Any, Optional
+
+import msgpack
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import metrics
+
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+COLUMNAR = "application/vnd.columnar+json"
+
+MEDIA_TYPES = {
+    JSON: JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    COLUMNAR: COLUMNAR,
+}
+# Names of the formats in the metrics
+FORMATS = {MSGPACK: "msgpack", COLUMNAR: "columnar"}
+
+
+def parse_quality(header: str) -> list[tuple[str, float]]:
+    """
+    Parses an Accept / Accept-Encoding header into its (value, quality) pairs.
+    """
+    values = []
+    for item in header.split(","):
+        value, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        if value:
+            values.append((value.lower(), quality))
+    return values
+
+
+def negotiate(accept: str) -> str:
+    # The stable sort keeps the client's order between equal qualities
+    for media_type, quality in sorted(parse_quality(accept), key=lambda item: -item[1]):
+        if quality > 0 and media_type in MEDIA_TYPES:
+            return MEDIA_TYPES[media_type]
+        if quality > 0 and media_type in ("*/*", "application/*"):
+            return JSON
+    return JSON
+
+
+def columnar(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {key: columnar(value) for key, value in data.items()}
+    if not isinstance(data, list):
+        return data
+    if not data or not all(isinstance(item, dict) for item in data):
+        return [columnar(item) for item in data]
+    # Fields excluded as None are missing from some items, so the columns are their union
+    columns = list(dict.fromkeys(key for item in data for key in item))
+    return {
+        "columns": columns,
+        "rows": [[columnar(item.get(column)) for column in columns] for item in data],
+    }
+
+
+def encode(body: bytes, media_type: str) -> bytes:
+    data = json.loads(body)
+    if media_type == MSGPACK:
+        return msgpack.packb(data)
+    return json.dumps(columnar(data), separators=(",", ":")).encode()
+
+
+class ContentNegotiationMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        media_type = negotiate(Headers(scope=scope).get("accept", ""))
+        if media_type == JSON:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        chunks: list[bytes] = []
+
+        async def send_encoded(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").split(";")[0]
+                if content_type == JSON and "content-encoding" not in headers:
+                    # Held back until the whole body is known, its length changes
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = b"".join(chunks)
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept")
+                if body:
+                    body = encode(body, media_type)
+                    headers["content-type"] = media_type
+                    headers["content-length"] = str(len(body))
+                    metrics.increment(f"responses_{FORMATS[media_type]}")
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_encoded)
@@ -0,0 +1,131 @@
+"""
+Profiles single requests on demand, to see where the time of a slow route goes in production.
+
+A request is profiled (cProfile) when it carries the profiling token (`X-Profile` header or
+`profile` query parameter), and 1 in `sample_every` requests are profiled when sampling is on. The
+SQL statements it runs are timed too. The profile (`.prof`, open it with pstats or snakeviz) and
+the SQL timings (`.sql.json`) are stored in the profiles directory, the response tells their name
+(`X-Profile`) and the app/db split of its time (`Server-Timing`).
+
+The middleware is only installed when profiling is enabled, so it costs nothing otherwise.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import itertools
+import json
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import metrics
+
+
+# SQL timings of the profiled request running in the current context, None when not profiled
+sql_timings: ContextVar[Optional[list[dict[str, Any]]]] = ContextVar("sql_timings", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if sql_timings.get() is not None:
+        context._profiling_started_at = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = sql_timings.get()
+    if timings is not None and hasattr(context, "_profiling_started_at"):
+        duration = time.perf_counter() - context._profiling_started_at
+        timings.append({"statement": statement, "duration_ms": duration * 1000})
+
+
+def track_sql_timings(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def untrack_sql_timings(engine: Engine) -> None:
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        token: Optional[str] = None,
+        sample_every: int = 0,
+    ) -> None:
+        self.app = app
+        self.directory = Path(directory)
+        self.token = token
+        self.sample_every = sample_every
+        self._requests = itertools.count(1)
+        # cProfile profiles the whole thread, so only one request is profiled at a time
+        self._busy = False
+
+    def requested(self, scope: Scope) -> bool:
+        if self.token is None:
+            return False
+        values = [
+            value.decode("latin-1") for name, value in scope["headers"] if name == b"x-profile"
+        ]
+        values += parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile", [])
+        return any(hmac.compare_digest(value, self.token) for value in values)
+
+    def sampled(self) -> bool:
+        return self.sample_every > 0 and next(self._requests) % self.sample_every == 0
+
+    def save(self, name: str, profiler: cProfile.Profile, timings: list[dict[str, Any]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.directory / f"{name}.prof")
+        (self.directory / f"{name}.sql.json").write_text(json.dumps(timings, indent=2))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._busy or not (self.requested(scope) or self.sampled()):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        name = "{}-{}-{}".format(
+            time.strftime("%Y%m%dT%H%M%S"),
+            re.sub(r"[^\w]+", "_", f"{scope['method']} {scope['path']}").strip("_"),
+            uuid.uuid4().hex[:8],
+        )
+        timings: list[dict[str, Any]] = []
+        token = sql_timings.set(timings)
+        profiler = cProfile.Profile()
+        started_at = time.perf_counter()
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - started_at) * 1000
+                db_ms = sum(timing["duration_ms"] for timing in timings)
+                server_timing = (
+                    f'app;dur={app_ms:.1f}, db;dur={db_ms:.1f};desc="{len(timings)} queries"'
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", server_timing.encode()),
+                    (b"x-profile", name.encode()),
+                ]
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            profiler.disable()
+            sql_timings.reset(token)
+            self._busy = False
+            # Marshalling a profile and writing files would block the event loop, in a thread
+            await asyncio.to_thread(self.save, name, profiler, timings)
+            metrics.increment("requests_profiled")
@@ -7,3 +7,9 @@ from .base import Base
 # Import your models here
 from .branch import Branch
 from .change_request import ChangeRequest
+from .tombstone import Tombstone
+from .change_request_object import ChangeRequestObject
+from .sap_content import SapContent
+from .change_request_archive import ChangeRequestArchive
+from .audit_entry import AuditEntry
+from .branch_stats import BranchStats
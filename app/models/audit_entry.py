@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base
+
+
+class AuditEntry(Base):
+    """
+    A mutation done through the CRUD layer, `changes` maps each changed field to [before, after].
+    """
+
+    __tablename__ = "audit_log"
+    __table_args__ = (Index("ix_audit_log_entity_key_id", "entity", "key", "id"),)
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+
+    # When the mutation was done, not when the entry was written (they are written later)
+    occurred_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    action = Column(String(length=20), nullable=False)
+    entity = Column(String(length=50), nullable=False)
+    key = Column(String(length=50), nullable=False)
+    changes = Column(JSONB, nullable=False)
@@ -2,7 +2,42 @@
 Defines base class with shared attributes for models (database tables).
 """
 
+from sqlalchemy import BigInteger, Column, DateTime, Sequence, Text, cast, func
 from sqlalchemy.ext.declarative import declarative_base
 
 
 Base = declarative_base()
+
+# Shared by every tracked table, so a single number orders all the writes (used as sync token)
+change_version_seq = Sequence("change_version_seq", metadata=Base.metadata)
+# Id of the writing transaction (its xid8, as a number). A version is taken when the row is written,
+# not when the transaction commits, so the sync finds the rows committed late with it
+current_transaction_id = cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+
+
+class TrackedMixin:
+    """
+    Adds write tracking columns, `version` is bumped on every insert and update and
+    `transaction_id` records the transaction which did it.
+    """
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+    version = Column(
+        BigInteger,
+        server_default=change_version_seq.next_value(),
+        onupdate=change_version_seq.next_value(),
+        nullable=False,
+        index=True,
+    )
+    transaction_id = Column(
+        BigInteger,
+        server_default=current_transaction_id,
+        onupdate=current_transaction_id,
+        nullable=False,
+        index=True,
+    )
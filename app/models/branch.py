@@ -1,16 +1,14 @@
-from uuid import uuid4
-
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from .base import Base
+from .base import Base, TrackedMixin
 
 
-class Branch(Base):
+class Branch(TrackedMixin, Base):
     __tablename__ = "branch"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
 
     title = Column(String(length=100), nullable=False, unique=True)
     description = Column(String(length=400))
@@ -18,5 +16,6 @@ class Branch(Base):
     change_requests = relationship(
         "ChangeRequest",
         lazy="selectin",
-        order_by="ChangeRequest.created_at",
+        # Rows created by the same transaction share created_at, the number breaks the tie
+        order_by="(ChangeRequest.created_at, ChangeRequest.number)",
     )
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Enum, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.enums import StatusEnum, TypeEnum
+from .base import Base
+from .change_request import enum_values
+
+
+class BranchStats(Base):
+    """
+    Number of change requests per branch, status and type. Kept up to date by the statement level
+    triggers of `change_request` (see the add_branch_stats migration), repaired by the
+    app.jobs.branch_stats job.
+    """
+
+    __tablename__ = "branch_stats"
+
+    branch_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("branch.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    status = Column(
+        Enum(StatusEnum, name="change_request_status", values_callable=enum_values),
+        primary_key=True,
+    )
+    type = Column(
+        Enum(TypeEnum, name="change_request_type", values_callable=enum_values),
+        primary_key=True,
+    )
+    count = Column(Integer, nullable=False)
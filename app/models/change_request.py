@@ -1,25 +1,42 @@
-from datetime import datetime
+from enum import EnumMeta
 
-from pytz import timezone
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 
-from .base import Base
+from app.enums import StatusEnum, TypeEnum
+from .base import Base, TrackedMixin
 
 
-class ChangeRequest(Base):
+def enum_values(enum: EnumMeta) -> list[str]:
+    # Stores SAP's one letter codes, not the enum members names
+    return [member.value for member in enum]
+
+
+class ChangeRequest(TrackedMixin, Base):
     __tablename__ = "change_request"
+    __table_args__ = (
+        # Covers the per branch lookups (diffs, branch loads) with index only scans
+        Index(
+            "ix_change_request_branch_id_number",
+            "branch_id",
+            "number",
+            postgresql_include=["status"],
+        ),
+    )
 
-    number = Column(String(length=20), primary_key=True, index=True)
+    number = Column(String(length=20), primary_key=True)
 
-    type = Column(String(length=1), nullable=False)
+    # Native enums take 4 bytes and reject unknown codes
+    type = Column(
+        Enum(TypeEnum, name="change_request_type", values_callable=enum_values),
+        nullable=False,
+    )
     description = Column(String(length=75))
-    status = Column(String(length=1), nullable=False)
-
-    created_at = Column(
-        DateTime(timezone=True),
-        default=datetime.now(tz=timezone("Asia/Jerusalem")),
+    status = Column(
+        Enum(StatusEnum, name="change_request_status", values_callable=enum_values),
         nullable=False,
     )
 
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
     branch_id = Column(UUID(as_uuid=True), ForeignKey("branch.id"), nullable=False)
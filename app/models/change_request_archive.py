@@ -0,0 +1,39 @@
+from sqlalchemy import Column, DateTime, Enum, Index, String, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.enums import StatusEnum, TypeEnum
+from .base import Base
+from .change_request import enum_values
+
+
+class ChangeRequestArchive(Base):
+    """
+    History of the archived change requests (see app/jobs/archive.py), partitioned by month of
+    creation. The partitions are named `change_request_archive_y<year>m<month>` and are created by
+    the archival job when it needs them.
+    """
+
+    __tablename__ = "change_request_archive"
+    __table_args__ = (
+        Index("ix_change_request_archive_branch_id_number", "branch_id", "number"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    number = Column(String(length=20), primary_key=True)
+
+    type = Column(
+        Enum(TypeEnum, name="change_request_type", values_callable=enum_values),
+        nullable=False,
+    )
+    description = Column(String(length=75))
+    status = Column(
+        Enum(StatusEnum, name="change_request_status", values_callable=enum_values),
+        nullable=False,
+    )
+
+    # Part of the primary key, as the partition key must be
+    created_at = Column(DateTime(timezone=True), primary_key=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # No foreign key, the history outlives the branch
+    branch_id = Column(UUID(as_uuid=True), nullable=False)
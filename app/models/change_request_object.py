@@ -0,0 +1,31 @@
+from sqlalchemy import Column, ForeignKey, Index, String
+
+from .base import Base
+
+
+class ChangeRequestObject(Base):
+    """
+    A repository object transported by a change request (SAP's E071 entry), indexed both ways:
+    by change request (primary key) and by object (inverted index).
+    """
+
+    __tablename__ = "change_request_object"
+    __table_args__ = (
+        Index(
+            "ix_change_request_object_object",
+            "pgmid",
+            "object_type",
+            "object_name",
+            "change_request_number",
+        ),
+    )
+
+    change_request_number = Column(
+        String(length=20),
+        ForeignKey("change_request.number", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    pgmid = Column(String(length=4), primary_key=True)
+    object_type = Column(String(length=4), primary_key=True)
+    object_name = Column(String(length=120), primary_key=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, LargeBinary, String, func
+
+from .base import Base
+
+
+class SapContent(Base):
+    """
+    Caches the content of a change request as fetched from SAP (zlib compressed JSON).
+    """
+
+    __tablename__ = "sap_content"
+    __table_args__ = (
+        # Eviction order, released change requests are never evicted so they are left out
+        Index(
+            "ix_sap_content_accessed_at",
+            "accessed_at",
+            postgresql_where="NOT immutable",
+        ),
+    )
+
+    change_request_number = Column(String(length=20), primary_key=True)
+
+    content = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    # Content of released change requests can't change in SAP, so it never expires
+    immutable = Column(Boolean, nullable=False)
+
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    accessed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+
+from .base import Base, change_version_seq, current_transaction_id
+
+
+class Tombstone(Base):
+    __tablename__ = "tombstone"
+
+    version = Column(
+        BigInteger,
+        server_default=change_version_seq.next_value(),
+        primary_key=True,
+    )
+    transaction_id = Column(
+        BigInteger,
+        server_default=current_transaction_id,
+        nullable=False,
+        index=True,
+    )
+
+    entity = Column(String(length=50), nullable=False)
+    key = Column(String(length=50), nullable=False)
+
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
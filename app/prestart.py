@@ -0,0 +1,93 @@
+"""
+Prepares the database before the server starts (see scripts/entrypoint.sh).
+
+Waits for PostgreSQL to become available and runs the migrations, alembic is only loaded when the
+database is not at the migrations head already, so a regular container start skips it.
+"""
+
+import ast
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import asyncpg
+
+from app.config import settings
+
+
+ALEMBIC_INI = Path(__file__).parent.parent / "alembic.ini"
+VERSIONS_DIR = ALEMBIC_INI.parent / "alembic" / "versions"
+
+
+def log(message: str) -> None:
+    print(message, file=sys.stderr)
+
+
+async def connect() -> asyncpg.Connection:
+    while True:
+        try:
+            return await asyncpg.connect(
+                host=settings.POSTGRES_HOST,
+                port=settings.POSTGRES_PORT,
+                user=settings.POSTGRES_USER,
+                password=settings.POSTGRES_PASSWORD,
+                database=settings.POSTGRES_DB,
+            )
+        except (OSError, asyncpg.CannotConnectNowError):
+            log("Waiting for PostgreSQL to become available...")
+            await asyncio.sleep(2)
+
+
+async def read_database_revisions() -> set[str]:
+    connection = await connect()
+    log("PostgreSQL is available")
+    try:
+        rows = await connection.fetch("SELECT version_num FROM alembic_version")
+    except asyncpg.UndefinedTableError:
+        return set()
+    finally:
+        await connection.close()
+    return {row["version_num"] for row in rows}
+
+
+def read_head_revisions() -> set[str]:
+    """
+    Finds the heads by parsing the revision files, which is much cheaper than loading alembic.
+    """
+    revisions, down_revisions = set(), set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        identifiers = {}
+        for line in path.read_text().splitlines():
+            if line.startswith(("revision =", "down_revision =")):
+                name, _, value = line.partition("=")
+                identifiers[name.strip()] = ast.literal_eval(value.strip())
+        revisions.add(identifiers["revision"])
+        down_revision = identifiers["down_revision"]
+        if isinstance(down_revision, str):
+            down_revisions.add(down_revision)
+        elif down_revision:
+            down_revisions.update(down_revision)
+    return revisions - down_revisions
+
+
+def upgrade() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(str(ALEMBIC_INI)), "head")
+
+
+def main() -> None:
+    started_at = time.perf_counter()
+    database_revisions = asyncio.run(read_database_revisions())
+    if database_revisions == read_head_revisions():
+        log("Database is up to date, skipping migrations")
+    else:
+        upgrade()
+    if settings.STARTUP_PROFILE:
+        log(f"Startup profile: database preparation took {time.perf_counter() - started_at:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
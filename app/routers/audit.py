@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, deps, schemas
+from app.config import settings
+
+
+router = APIRouter(prefix="/audit", route_class=deps.SessionRoute)
+
+
+@router.get("/", response_model=list[schemas.AuditEntry])
+async def read_audit_log(
+    entity: Optional[str] = None,
+    key: Optional[str] = None,
+    before: Optional[int] = None,
+    limit: int = settings.PAGE_SIZE,
+    session: AsyncSession = Depends(deps.get_session),
+) -> list[schemas.AuditEntry]:
+    return await crud.audit_entry.read_many_filtered(
+        session=session,
+        entity=entity,
+        key=key,
+        before=before,
+        limit=limit,
+    )
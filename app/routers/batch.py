@@ -0,0 +1,107 @@
+from typing import Any, Union
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import deps, schemas
+from app.config import settings
+from app.db import BatchSession
+from app.routers import branch, change_request
+
+
+router = APIRouter(prefix="/batch")
+
+
+def resolve_branch_id(branch_id: Union[UUID, str], refs: dict[str, UUID]) -> UUID:
+    if isinstance(branch_id, UUID):
+        return branch_id
+    if branch_id[1:] not in refs:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"unknown reference {branch_id}, reference a branch created by an earlier "
+            f"operation of the batch",
+        )
+    return refs[branch_id[1:]]
+
+
+async def execute_operation(
+    operation: schemas.BatchOperation,
+    refs: dict[str, UUID],
+    session: AsyncSession,
+) -> Any:
+    # Every operation runs its own route, so the batch gets the exact same validations
+    if isinstance(operation, schemas.batch.CreateBranchOperation):
+        db_branch = await branch.create_branch(branch_obj=operation.data, session=session)
+        if operation.ref:
+            refs[operation.ref] = db_branch.id
+        return schemas.Branch.from_orm(db_branch)
+    if isinstance(operation, schemas.batch.UpdateBranchOperation):
+        db_branch = await branch.update_branch(
+            branch_id=resolve_branch_id(operation.branch_id, refs),
+            branch_obj=operation.data,
+            session=session,
+        )
+        return schemas.Branch.from_orm(db_branch)
+    if isinstance(operation, schemas.batch.DeleteBranchOperation):
+        db_branch = await branch.delete_branch(
+            branch_id=resolve_branch_id(operation.branch_id, refs),
+            session=session,
+        )
+        return schemas.Branch.from_orm(db_branch)
+    if isinstance(operation, schemas.batch.CreateChangeRequestOperation):
+        db_change_request = await change_request.create_change_request(
+            branch_id=resolve_branch_id(operation.branch_id, refs),
+            change_request_obj=operation.data,
+            session=session,
+        )
+        return schemas.ChangeRequest.from_orm(db_change_request)
+    if isinstance(operation, schemas.batch.MoveChangeRequestsOperation):
+        db_branches = await branch.move_change_requests(
+            target_branch_id=resolve_branch_id(operation.target_branch_id, refs),
+            source_branch_id=resolve_branch_id(operation.source_branch_id, refs),
+            change_requests_numbers=operation.change_requests_numbers,
+            session=session,
+        )
+        return [schemas.Branch.from_orm(db_branch) for db_branch in db_branches]
+
+
+@router.post(
+    "/",
+    response_model=list[schemas.BatchResult],
+    response_model_exclude_none=True,
+)
+async def execute_batch(
+    batch: schemas.Batch,
+    session: BatchSession = Depends(deps.get_batch_session),
+) -> list[schemas.BatchResult]:
+    if len(batch.operations) > settings.PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"a batch can contain up to {settings.PAGE_SIZE} operations",
+        )
+
+    refs: dict[str, UUID] = {}
+    results = []
+    for index, operation in enumerate(batch.operations):
+        try:
+            result = await execute_operation(operation=operation, refs=refs, session=session)
+        except HTTPException as error:
+            await session.rollback()
+            raise HTTPException(
+                status_code=error.status_code,
+                detail={"index": index, "op": operation.op, "detail": error.detail},
+            )
+        # Serialized right away, the result shows the state right after its operation
+        results.append(
+            schemas.BatchResult(
+                index=index,
+                op=operation.op,
+                result=jsonable_encoder(result, exclude_none=True),
+            )
+        )
+        # The next operations must not see stale relationships (e.g. a branch's change requests)
+        session.expire_all()
+    await session.commit_batch()
+    return results
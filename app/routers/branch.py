@@ -1,14 +1,19 @@
+from typing import Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app import crud, deps, models, schemas
 from app.config import settings
+from app.utils.fieldsets import partial_schema, sparse_response
+from app.utils.scheduler import plan_waves
 
 
-router = APIRouter(prefix="/branches")
+router = APIRouter(prefix="/branches", route_class=deps.SessionRoute)
 
 
 @router.get(
@@ -19,9 +24,12 @@ router = APIRouter(prefix="/branches")
 async def read_branches(
     skip: int = 0,
     limit: int = settings.PAGE_SIZE,
+    fields: Optional[list[str]] = Depends(deps.get_fields(schemas.Branch)),
     session: AsyncSession = Depends(deps.get_session),
-) -> list[models.Branch]:
-    branches = await crud.branch.read_many(session=session, skip=skip, limit=limit)
+) -> Union[list[models.Branch], Response]:
+    branches = await crud.branch.read_many(session=session, skip=skip, limit=limit, fields=fields)
+    if fields is not None:
+        return sparse_response(branches, schema=schemas.Branch, fields=fields)
     return branches
 
 
@@ -46,6 +54,43 @@ async def create_branch(
     return branch
 
 
+@router.get(
+    "/diff",
+    response_model=list[schemas.ChangeRequestReconciliation],
+)
+async def diff_many_branches(
+    branches_ids: list[UUID] = Query(..., min_items=2),
+    session: AsyncSession = Depends(deps.get_session),
+) -> list[schemas.ChangeRequestReconciliation]:
+    for branch_id in branches_ids:
+        await crud.branch.read_or_404(session=session, obj_id=branch_id, fields=["id"])
+    rows = await crud.change_request.diff_many(session=session, branches_ids=branches_ids)
+    return [
+        schemas.ChangeRequestReconciliation(
+            number=row.number,
+            statuses=dict(zip(row.branches_ids, row.statuses)),
+        )
+        for row in rows
+    ]
+
+
+@router.get("/stats", response_model=list[schemas.BranchStats])
+async def read_branches_stats(
+    session: AsyncSession = Depends(deps.get_session),
+) -> list[schemas.BranchStats]:
+    stats: dict[UUID, schemas.BranchStats] = {}
+    for row in await crud.branch_stats.read_all(session=session):
+        branch_stats = stats.setdefault(
+            row.branch_id,
+            schemas.BranchStats(branch_id=row.branch_id, total=0, statuses={}, types={}),
+        )
+        status_code, type_code = row.status.value, row.type.value
+        branch_stats.total += row.count
+        branch_stats.statuses[status_code] = branch_stats.statuses.get(status_code, 0) + row.count
+        branch_stats.types[type_code] = branch_stats.types.get(type_code, 0) + row.count
+    return list(stats.values())
+
+
 @router.get(
     "/{branch_id}",
     response_model=schemas.Branch,
@@ -53,9 +98,30 @@ async def create_branch(
 )
 async def read_branch(
     branch_id: UUID,
+    include_archived: bool = False,
+    fields: Optional[list[str]] = Depends(deps.get_fields(schemas.Branch)),
     session: AsyncSession = Depends(deps.get_session),
-) -> models.Branch:
-    branch = await crud.branch.read_or_404(session=session, obj_id=branch_id)
+) -> Union[models.Branch, schemas.Branch, Response]:
+    branch = await crud.branch.read_or_404(
+        session=session,
+        obj_id=branch_id,
+        coalesce=True,
+        fields=fields,
+    )
+    if include_archived and (fields is None or "change_requests" in fields):
+        # The archived change requests are older, so they go first
+        archived = await crud.change_request_archive.read_many_by_branch(
+            session=session,
+            branch_id=branch_id,
+        )
+        schema = schemas.Branch if fields is None else partial_schema(schemas.Branch, tuple(fields))
+        branch = schema.from_orm(branch)
+        branch.change_requests[:0] = map(schemas.ChangeRequest.from_orm, archived)
+        if fields is not None:
+            return JSONResponse(content=jsonable_encoder(branch, exclude_none=True))
+        return branch
+    if fields is not None:
+        return sparse_response(branch, schema=schemas.Branch, fields=fields)
     return branch
 
 
@@ -143,3 +209,95 @@ async def move_change_requests(
     await session.refresh(source_branch)
 
     return [target_branch, source_branch]
+
+
+@router.get(
+    "/{branch_id}/diff/{other_branch_id}",
+    response_model=schemas.BranchDiff,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def diff_branches(
+    branch_id: UUID,
+    other_branch_id: UUID,
+    stream: bool = False,
+    session: AsyncSession = Depends(deps.get_session),
+) -> Union[schemas.BranchDiff, Response]:
+    await crud.branch.read_or_404(session=session, obj_id=branch_id, fields=["id"])
+    await crud.branch.read_or_404(session=session, obj_id=other_branch_id, fields=["id"])
+
+    if stream:
+        # One ChangeRequestDiff per line, rows are sent while they are read from the database
+        result = await crud.change_request.stream_diff(
+            session=session,
+            branch_id=branch_id,
+            other_branch_id=other_branch_id,
+        )
+
+        async def lines():
+            async for row in result:
+                yield schemas.ChangeRequestDiff.from_orm(row).json() + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    rows = await crud.change_request.diff(
+        session=session,
+        branch_id=branch_id,
+        other_branch_id=other_branch_id,
+    )
+    return schemas.BranchDiff(
+        only_in_branch=[row.number for row in rows if row.other_status is None],
+        only_in_other=[row.number for row in rows if row.status is None],
+        status_differences=[
+            schemas.ChangeRequestStatusDifference(
+                number=row.number,
+                status=row.status,
+                other_status=row.other_status,
+            )
+            for row in rows
+            if row.status is not None and row.other_status is not None
+        ],
+    )
+
+
+@router.get(
+    "/{branch_id}/conflicts",
+    response_model=list[schemas.Conflict],
+)
+async def read_branch_conflicts(
+    branch_id: UUID,
+    session: AsyncSession = Depends(deps.get_session),
+) -> list[schemas.Conflict]:
+    await crud.branch.read_or_404(session=session, obj_id=branch_id, fields=["id"])
+    rows = await crud.change_request_object.read_conflicts(session=session, branch_id=branch_id)
+    return [
+        schemas.Conflict(
+            pgmid=row.pgmid,
+            object_type=row.object_type,
+            object_name=row.object_name,
+            change_requests=[
+                schemas.ConflictingChangeRequest(number=number, branch_id=branch_id)
+                for number, branch_id in zip(row.numbers, row.branches_ids)
+            ],
+        )
+        for row in rows
+    ]
+
+
+@router.get(
+    "/{branch_id}/import-plan",
+    response_model=schemas.ImportPlan,
+)
+async def read_branch_import_plan(
+    branch_id: UUID,
+    session: AsyncSession = Depends(deps.get_session),
+) -> schemas.ImportPlan:
+    await crud.branch.read_or_404(session=session, obj_id=branch_id, fields=["id"])
+    numbers = await crud.change_request.read_numbers_by_branch(session=session, branch_id=branch_id)
+    dependencies = await crud.change_request_object.read_import_dependencies(
+        session=session,
+        branch_id=branch_id,
+    )
+    return schemas.ImportPlan(
+        slots=settings.SAP_IMPORT_SLOTS,
+        waves=plan_waves(numbers=numbers, dependencies=dependencies),
+    )
@@ -1,12 +1,15 @@
+from typing import Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, deps, models, schemas
+from app.utils import content_cache
+from app.utils.fieldsets import sparse_response
 
 
-router = APIRouter(prefix="/branches/{branch_id}/change-requests")
+router = APIRouter(prefix="/branches/{branch_id}/change-requests", route_class=deps.SessionRoute)
 
 
 @router.post(
@@ -20,8 +23,9 @@ async def create_change_request(
     change_request_obj: schemas.ChangeRequestCreate,
     session: AsyncSession = Depends(deps.get_session),
 ) -> models.ChangeRequest:
-    await crud.branch.read_or_404(session=session, obj_id=branch_id)
-    # TODO: integrate with hovav's api
+    await crud.branch.read_or_404(session=session, obj_id=branch_id, fields=["id"])
+    # TODO: integrate with hovav's api, call it inside `outside_transaction(session)` so the
+    # connection isn't held while waiting for SAP
     change_request = await crud.change_request.create(
         session=session,
         in_obj=change_request_obj,
@@ -30,6 +34,40 @@ async def create_change_request(
     return change_request
 
 
+@router.post(
+    "/transition",
+    response_model=schemas.TransitionResult,
+)
+async def transition_change_requests(
+    branch_id: UUID,
+    transition: schemas.StatusTransition,
+    session: AsyncSession = Depends(deps.get_session),
+) -> schemas.TransitionResult:
+    await crud.branch.read_or_404(session=session, obj_id=branch_id, fields=["id"])
+    numbers = list(dict.fromkeys(transition.numbers))
+    transitioned, rejected = await crud.change_request.bulk_transition_status(
+        session=session,
+        branch_id=branch_id,
+        objs_ids=numbers,
+        status=transition.status,
+    )
+    transitioned, statuses = set(transitioned), dict(rejected)
+    return schemas.TransitionResult(
+        transitioned=[number for number in numbers if number in transitioned],
+        rejected=[
+            schemas.RejectedTransition(
+                number=number,
+                status=statuses.get(number),
+                detail=f"can not move from {statuses[number].name} to {transition.status.name}"
+                if number in statuses
+                else "change request not found in the branch",
+            )
+            for number in numbers
+            if number not in transitioned
+        ],
+    )
+
+
 @router.get(
     "/{change_request_id}",
     response_model=schemas.ChangeRequest,
@@ -38,14 +76,33 @@ async def create_change_request(
 async def read_change_request(
     branch_id: UUID,
     change_request_id: str,
+    include_archived: bool = False,
+    fields: Optional[list[str]] = Depends(deps.get_fields(schemas.ChangeRequest)),
     session: AsyncSession = Depends(deps.get_session),
-) -> models.ChangeRequest:
-    await crud.branch.read_or_404(session=session, obj_id=branch_id)
-    change_request = await crud.change_request.read_with_branch_id_or_404(
+) -> Union[models.ChangeRequest, models.ChangeRequestArchive, Response]:
+    # Existence check only, don't load the branch's change requests
+    await crud.branch.read_or_404(session=session, obj_id=branch_id, coalesce=True, fields=["id"])
+    change_request = await crud.change_request.read_with_branch_id(
         session=session,
         obj_id=change_request_id,
         branch_id=branch_id,
+        coalesce=True,
+        fields=fields,
     )
+    if change_request is None and include_archived:
+        change_request = await crud.change_request_archive.read_with_branch_id(
+            session=session,
+            obj_id=change_request_id,
+            branch_id=branch_id,
+            fields=fields,
+        )
+    if change_request is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Change_request not found",
+        )
+    if fields is not None:
+        return sparse_response(change_request, schema=schemas.ChangeRequest, fields=fields)
     return change_request
 
 
@@ -88,3 +145,50 @@ async def delete_change_request(
     # TODO: add is cr empty validation hovav's api
     change_request = await crud.change_request.delete(session, db_obj=change_request)
     return change_request
+
+
+@router.put(
+    "/{change_request_id}/objects",
+    response_model=list[schemas.ChangeRequestObject],
+)
+async def replace_change_request_objects(
+    branch_id: UUID,
+    change_request_id: str,
+    objects: list[schemas.ChangeRequestObjectCreate],
+    session: AsyncSession = Depends(deps.get_session),
+) -> list[models.ChangeRequestObject]:
+    # Bulk loads the change request content (as fetched from SAP) into the object index
+    await crud.change_request.read_with_branch_id_or_404(
+        session=session,
+        obj_id=change_request_id,
+        branch_id=branch_id,
+        fields=["number"],
+    )
+    await crud.change_request_object.replace_many(
+        session=session,
+        change_request_number=change_request_id,
+        in_objs=objects,
+    )
+    return await crud.change_request_object.read_many_by_change_request(
+        session=session,
+        change_request_number=change_request_id,
+    )
+
+
+@router.get(
+    "/{change_request_id}/content",
+    response_model=list[schemas.ChangeRequestObjectCreate],
+)
+async def read_change_request_content(
+    branch_id: UUID,
+    change_request_id: str,
+    session: AsyncSession = Depends(deps.get_session),
+) -> list[schemas.ChangeRequestObjectCreate]:
+    # The content as it is in SAP, served from the content cache when possible
+    change_request = await crud.change_request.read_with_branch_id_or_404(
+        session=session,
+        obj_id=change_request_id,
+        branch_id=branch_id,
+        fields=["number", "status"],
+    )
+    return await content_cache.read_content(session=session, change_request=change_request)
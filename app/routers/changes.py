@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, deps, schemas
+from app.config import settings
+
+
+router = APIRouter(prefix="/changes", route_class=deps.SessionRoute)
+
+
+@router.get(
+    "/",
+    response_model=schemas.Changes,
+    response_model_exclude_none=True,
+)
+async def read_changes(
+    since: str = "0",
+    limit: int = settings.PAGE_SIZE,
+    session: AsyncSession = Depends(deps.get_session),
+) -> schemas.Changes:
+    try:
+        token = schemas.ChangeToken.parse(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid token {since!r}",
+        )
+    limit = min(limit, settings.PAGE_SIZE)
+    snapshot = await crud.change_tracking.read_snapshot(session=session)
+
+    # Versions are taken at write time, the transactions writing when the previous page was read
+    # may have committed rows below its version since: they are returned first, within the limit
+    branches, change_requests, tombstones = [], [], []
+    if token.transaction_id is not None:
+        late = {
+            "until": token.version,
+            "transaction_id": token.transaction_id,
+            "writers": token.writers,
+            "after": token.late_after,
+            "limit": limit + 1,
+        }
+        branches = await crud.branch.read_many_committed_late(session=session, **late)
+        change_requests = await crud.change_request.read_many_committed_late(
+            session=session, **late
+        )
+        tombstones = await crud.tombstone.read_many_committed_late(session=session, **late)
+        versions = sorted(obj.version for obj in [*branches, *change_requests, *tombstones])
+        if len(versions) > limit:
+            # More than a page, the next one continues after the last late row returned
+            late_after = versions[limit - 1]
+            return schemas.Changes(
+                branches=[branch for branch in branches if branch.version <= late_after],
+                change_requests=[cr for cr in change_requests if cr.version <= late_after],
+                deleted=[tombstone for tombstone in tombstones if tombstone.version <= late_after],
+                next_token=str(token._replace(late_after=late_after)),
+            )
+    remaining = limit - len(branches) - len(change_requests) - len(tombstones)
+
+    fresh_branches = await crud.branch.read_many_since(
+        session=session,
+        since=token.version,
+        limit=remaining,
+    )
+    fresh_change_requests = await crud.change_request.read_many_since(
+        session=session,
+        since=token.version,
+        limit=remaining,
+    )
+    fresh_tombstones = await crud.tombstone.read_many_since(
+        session=session,
+        since=token.version,
+        limit=remaining,
+    )
+
+    # Keep only the `remaining` lowest versions of all the kinds together, otherwise the token
+    # could jump over rows of a kind that was cut by its own limit
+    fresh = [*fresh_branches, *fresh_change_requests, *fresh_tombstones]
+    versions = sorted(obj.version for obj in fresh)[:remaining]
+    next_version = versions[-1] if versions else token.version
+    branches += [branch for branch in fresh_branches if branch.version <= next_version]
+    change_requests += [cr for cr in fresh_change_requests if cr.version <= next_version]
+    tombstones += [tombstone for tombstone in fresh_tombstones if tombstone.version <= next_version]
+
+    # The late rows were all returned, the next page only looks for those of the transactions
+    # writing now (and of the ones which start later)
+    writers = await crud.change_tracking.in_flight_writers(session=session, snapshot=snapshot)
+    return schemas.Changes(
+        branches=branches,
+        change_requests=change_requests,
+        deleted=tombstones,
+        next_token=str(schemas.ChangeToken(next_version, snapshot.xmax, tuple(writers))),
+    )
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from app.utils.metrics import metrics
+
+
+router = APIRouter(prefix="/metrics")
+
+
+@router.get("/", response_model=dict[str, float])
+async def read_metrics() -> dict[str, float]:
+    return metrics.snapshot()
@@ -1,2 +1,20 @@
 from .branch import Branch, BranchCreate, BranchDB, BranchUpdate
 from .change_request import ChangeRequest, ChangeRequestCreate, ChangeRequestDB, ChangeRequestUpdate
+from .changes import BranchChange, ChangeRequestChange, Changes, ChangeToken, Tombstone
+from .batch import Batch, BatchOperation, BatchResult
+from .diff import (
+    BranchDiff,
+    ChangeRequestDiff,
+    ChangeRequestReconciliation,
+    ChangeRequestStatusDifference,
+)
+from .change_request_object import (
+    ChangeRequestObject,
+    ChangeRequestObjectCreate,
+    Conflict,
+    ConflictingChangeRequest,
+)
+from .import_plan import ImportPlan
+from .transition import RejectedTransition, StatusTransition, TransitionResult
+from .audit import AuditEntry
+from .branch_stats import BranchStats
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+# Properties to return via API, changes maps each changed field to [before, after]
+class AuditEntry(BaseModel):
+    id: int
+    occurred_at: datetime
+    action: str
+    entity: str
+    key: str
+    changes: dict[str, list[Any]]
+
+    class Config:
+        orm_mode = True
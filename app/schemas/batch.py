@@ -0,0 +1,65 @@
+from typing import Annotated, Any, Literal, Optional, Union
+from uuid import UUID
+
+from pydantic import BaseModel, Field, constr
+
+from .branch import BranchCreate, BranchUpdate
+from .change_request import ChangeRequestCreate
+
+
+# Branch id, or "$<ref>" of a branch created by an earlier operation of the batch
+BranchReference = Union[UUID, constr(regex=r"^\$\w+$")]
+
+
+class CreateBranchOperation(BaseModel):
+    op: Literal["create_branch"]
+    ref: Optional[constr(regex=r"^\w+$")]
+    data: BranchCreate
+
+
+class UpdateBranchOperation(BaseModel):
+    op: Literal["update_branch"]
+    branch_id: BranchReference
+    data: BranchUpdate
+
+
+class DeleteBranchOperation(BaseModel):
+    op: Literal["delete_branch"]
+    branch_id: BranchReference
+
+
+class CreateChangeRequestOperation(BaseModel):
+    op: Literal["create_change_request"]
+    branch_id: BranchReference
+    data: ChangeRequestCreate
+
+
+class MoveChangeRequestsOperation(BaseModel):
+    op: Literal["move_change_requests"]
+    target_branch_id: BranchReference
+    source_branch_id: BranchReference
+    change_requests_numbers: list[str]
+
+
+BatchOperation = Annotated[
+    Union[
+        CreateBranchOperation,
+        UpdateBranchOperation,
+        DeleteBranchOperation,
+        CreateChangeRequestOperation,
+        MoveChangeRequestsOperation,
+    ],
+    Field(discriminator="op"),
+]
+
+
+# Properties to receive via API, the operations are executed in order
+class Batch(BaseModel):
+    operations: list[BatchOperation] = Field(..., min_items=1)
+
+
+# Properties to return via API, result is the response of the matching single operation route
+class BatchResult(BaseModel):
+    index: int
+    op: str
+    result: Any
@@ -0,0 +1,11 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+# Number of change requests of the branch, in total and per status / type code
+class BranchStats(BaseModel):
+    branch_id: UUID
+    total: int
+    statuses: dict[str, int]
+    types: dict[str, int]
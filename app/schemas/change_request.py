@@ -1,22 +1,9 @@
-from enum import Enum
 from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel
 
-
-class StatusEnum(str, Enum):
-    modifiable = "D"
-    modifiable_protected = "L"
-    release_standard = "O"
-    released = "R"
-    released_with_import_protection_for_repaired_objects = "N"
-
-
-class TypeEnum(str, Enum):
-    workbench = "K"
-    customizing = "W"
-    transport_of_copies = "T"
+from app.enums import StatusEnum, TypeEnum
 
 
 # Shared properties
@@ -0,0 +1,33 @@
+from uuid import UUID
+
+from pydantic import BaseModel, constr
+
+
+# Shared properties
+class ChangeRequestObjectBase(BaseModel):
+    pgmid: constr(max_length=4)  # e.g. R3TR, LIMU
+    object_type: constr(max_length=4)  # e.g. PROG, CLAS, TABL
+    object_name: constr(max_length=120)
+
+
+# Properties to receive via API on creation
+class ChangeRequestObjectCreate(ChangeRequestObjectBase):
+    pass
+
+
+# Additional properties to return via API
+class ChangeRequestObject(ChangeRequestObjectBase):
+    change_request_number: str
+
+    class Config:
+        orm_mode = True
+
+
+class ConflictingChangeRequest(BaseModel):
+    number: str
+    branch_id: UUID
+
+
+# An object transported by more than one change request
+class Conflict(ChangeRequestObjectBase):
+    change_requests: list[ConflictingChangeRequest]
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from pydantic import BaseModel
+
+from .branch import BranchDB
+from .change_request import ChangeRequest
+
+
+# Branch as returned by delta sync (without its change requests)
+class BranchChange(BranchDB):
+    updated_at: datetime
+    version: int
+
+
+# Change request as returned by delta sync
+class ChangeRequestChange(ChangeRequest):
+    updated_at: datetime
+    version: int
+
+
+# Marks a deleted row, entity is the table name and key is the primary key
+class Tombstone(BaseModel):
+    version: int
+    entity: str
+    key: str
+    deleted_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class ChangeToken(NamedTuple):
+    """
+    Position of a delta sync, formatted as `<version>.<transaction id>[.<writers>[.<late after>]]`:
+    the highest version returned, the first transaction which started after the read and the
+    `-` separated transactions which were writing then (see app/crud/change_tracking.py), their
+    rows up to the version may be committed late. `late after` is the last late row returned
+    when they didn't fit in the page. A bare version (the former format) skips the late rows.
+    """
+
+    version: int
+    transaction_id: Optional[int] = None
+    writers: tuple[int, ...] = ()
+    late_after: int = 0
+
+    @classmethod
+    def parse(cls, token: str) -> "ChangeToken":
+        parts = token.split(".")
+        if len(parts) > 4:
+            raise ValueError(token)
+        version, transaction_id, writers, late_after = parts + [""] * (4 - len(parts))
+        if not transaction_id and (writers or late_after):
+            raise ValueError(token)
+        return cls(
+            int(version),
+            int(transaction_id) if transaction_id else None,
+            tuple(int(writer) for writer in writers.split("-") if writer),
+            int(late_after) if late_after else 0,
+        )
+
+    def __str__(self) -> str:
+        token = f"{self.version}.{self.transaction_id}"
+        if self.writers or self.late_after:
+            token += f".{'-'.join(map(str, self.writers))}"
+        if self.late_after:
+            token += f".{self.late_after}"
+        return token
+
+
+# Properties to return via API, pass next_token as `since` to continue
+class Changes(BaseModel):
+    branches: list[BranchChange]
+    change_requests: list[ChangeRequestChange]
+    deleted: list[Tombstone]
+    next_token: str
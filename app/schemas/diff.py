@@ -0,0 +1,35 @@
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from .change_request import StatusEnum
+
+
+# A change request which differs between two branches, no status means it's missing from the branch
+class ChangeRequestDiff(BaseModel):
+    number: str
+    status: Optional[StatusEnum]
+    other_status: Optional[StatusEnum]
+
+    class Config:
+        orm_mode = True
+
+
+class ChangeRequestStatusDifference(BaseModel):
+    number: str
+    status: StatusEnum
+    other_status: StatusEnum
+
+
+# Properties to return via API
+class BranchDiff(BaseModel):
+    only_in_branch: list[str]
+    only_in_other: list[str]
+    status_differences: list[ChangeRequestStatusDifference]
+
+
+# A change request which differs across many branches, with its status per containing branch
+class ChangeRequestReconciliation(BaseModel):
+    number: str
+    statuses: dict[UUID, StatusEnum]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+# Change requests of a wave don't depend on each other, so they are imported in parallel
+class ImportPlan(BaseModel):
+    slots: int
+    waves: list[list[str]]
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from pydantic import BaseModel, conlist
+
+from app.config import settings
+from .change_request import StatusEnum
+
+
+# Properties to receive via API, moves all the change requests to the status at once
+class StatusTransition(BaseModel):
+    numbers: conlist(str, min_items=1, max_items=settings.PAGE_SIZE)
+    status: StatusEnum
+
+
+# No status means the change request is not in the branch
+class RejectedTransition(BaseModel):
+    number: str
+    status: Optional[StatusEnum]
+    detail: str
+
+
+# Properties to return via API
+class TransitionResult(BaseModel):
+    transitioned: list[str]
+    rejected: list[RejectedTransition]
@@ -0,0 +1,36 @@
+"""
+Runs the application using a single uvicorn process manager (development mode).
+
+Production runs under gunicorn with uvicorn workers instead, see gunicorn.conf.py.
+"""
+
+import argparse
+
+import uvicorn
+
+from app.config import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reload", action="store_true", help="restart the server on code changes")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS,
+        reload=args.reload,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE,
+        backlog=settings.SERVER_BACKLOG,
+        access_log=settings.SERVER_ACCESS_LOG,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        log_level=settings.SERVER_LOG_LEVEL,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Write-behind audit log of the mutations done through the CRUD layer.
+
+The CRUD operations `record` their changes on the session, the entries are handed to the writer
+when the session commits (and dropped when it rolls back, a batch hands them over on its real
+commit only). The writer buffers them in memory and inserts them in batches, when
+AUDIT_BATCH_SIZE entries are buffered or every AUDIT_FLUSH_INTERVAL seconds, so a mutation never
+waits for its audit row. Shutdown flushes whatever is left.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import async_session, insert_many
+from app.models import AuditEntry
+from app.utils.metrics import metrics
+
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def snapshot(db_obj: Any) -> dict[str, Any]:
+    """
+    Returns the column values of the object (JSON compatible), loaded attributes only.
+    """
+    state = inspect(db_obj)
+    return jsonable_encoder(
+        {
+            attr.key: state.dict[attr.key]
+            for attr in state.mapper.column_attrs
+            if attr.key in state.dict
+        }
+    )
+
+
+def diff(before: dict[str, Any], after: dict[str, Any]) -> dict[str, list[Any]]:
+    # An update compares the fields known on both sides (server generated ones may be unloaded)
+    fields = before.keys() & after.keys() if before and after else before.keys() | after.keys()
+    return {
+        field: [before.get(field), after.get(field)]
+        for field in sorted(fields)
+        if before.get(field) != after.get(field)
+    }
+
+
+def record(
+    session: AsyncSession,
+    action: str,
+    entity: str,
+    key: Any,
+    before: Optional[dict[str, Any]] = None,
+    after: Optional[dict[str, Any]] = None,
+) -> None:
+    """
+    Records a mutation of the session's transaction, it's audited once the transaction commits.
+    """
+    session.sync_session.info.setdefault("audit", []).append(
+        {
+            "occurred_at": datetime.now(tz=timezone.utc),
+            "action": action,
+            "entity": entity,
+            "key": str(key),
+            "changes": diff(before or {}, after or {}),
+        }
+    )
+
+
+class AuditWriter:
+    def __init__(self, batch_size: int, flush_interval: float, max_buffered: int) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.buffer: list[dict[str, Any]] = []
+        self._full = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, entries: list[dict[str, Any]]) -> None:
+        room = self.max_buffered - len(self.buffer)
+        if room < len(entries):
+            # The database is not keeping up, drop rather than grow without bound
+            metrics.increment("audit_dropped", len(entries) - max(room, 0))
+            entries = entries[: max(room, 0)]
+        self.buffer.extend(entries)
+        metrics.set("audit_buffered", len(self.buffer))
+        if len(self.buffer) >= self.batch_size:
+            self._full.set()
+
+    async def flush(self, session: Optional[AsyncSession] = None) -> int:
+        """
+        Writes the buffered entries with multi-row inserts, returns how many were written.
+        """
+        entries, self.buffer = self.buffer, []
+        self._full.clear()
+        if not entries:
+            return 0
+        try:
+            if session is None:
+                async with async_session() as session:
+                    await self._insert(session, entries)
+            else:
+                await self._insert(session, entries)
+        except BaseException:
+            # Put them back for the next flush (cancelled ones too), in their original order
+            self.buffer[:0] = entries
+            raise
+        metrics.increment("audit_written", len(entries))
+        metrics.set("audit_buffered", len(self.buffer))
+        return len(entries)
+
+    @staticmethod
+    async def _insert(session: AsyncSession, entries: list[dict[str, Any]]) -> None:
+        await insert_many(session, AuditEntry, entries)
+        await session.commit()
+
+    async def run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Audit log flush failed, retrying on the next one")
+
+    def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Not cancelled, an insert in progress is let finish (a cancelled one could have been
+            # committed already and be written twice), the loop exits after it
+            self._stopping = True
+            self._full.set()
+            task, self._task = self._task, None
+            await task
+        await self.flush()
+
+
+audit_writer = AuditWriter(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+    max_buffered=settings.AUDIT_MAX_BUFFERED,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def hand_over_entries(session: Session) -> None:
+    entries = session.info.pop("audit", None)
+    if entries:
+        audit_writer.add(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_entries(session: Session) -> None:
+    session.info.pop("audit", None)
@@ -0,0 +1,110 @@
+"""
+Read-through cache of the change requests content fetched from SAP, stored in PostgreSQL.
+
+Released change requests can't be changed in SAP, so their content is cached forever. Content of
+modifiable ones expires after SAP_CONTENT_CACHE_TTL seconds, and the least recently used of it is
+evicted once it takes more than SAP_CONTENT_CACHE_MAX_BYTES.
+"""
+
+import json
+import zlib
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import parse_obj_as
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.config import settings
+from app.db import outside_transaction
+from app.enums import StatusEnum
+from app.schemas import ChangeRequestObjectCreate
+from app.utils.metrics import metrics
+
+
+Fetch = Callable[[str], Awaitable[list[ChangeRequestObjectCreate]]]
+
+IMMUTABLE_STATUSES = (
+    StatusEnum.released,
+    StatusEnum.released_with_import_protection_for_repaired_objects,
+)
+
+
+def encode(content: list[ChangeRequestObjectCreate]) -> bytes:
+    return zlib.compress(json.dumps(jsonable_encoder(content), separators=(",", ":")).encode())
+
+
+def decode(content: bytes) -> list[ChangeRequestObjectCreate]:
+    return parse_obj_as(list[ChangeRequestObjectCreate], json.loads(zlib.decompress(content)))
+
+
+async def fetch_from_sap(change_request_number: str) -> list[ChangeRequestObjectCreate]:
+    if not settings.SAP_AUTH_URL:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="The SAP integration is disabled",
+        )
+    # Imported lazily, the SAP client (and httpx) is only loaded when it is used
+    from httpx import HTTPError
+
+    from app.utils import sap
+
+    try:
+        return await sap.fetch_change_request_content(
+            client=sap.get_client(),
+            change_request_number=change_request_number,
+        )
+    except HTTPError as error:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Fetching the content from SAP failed: {error!r}",
+        ) from error
+
+
+async def read_content(
+    session: AsyncSession,
+    change_request: models.ChangeRequest,
+    fetch: Optional[Fetch] = None,
+) -> list[ChangeRequestObjectCreate]:
+    # Read before the cache writes commit (and expire) the change request
+    number = change_request.number
+    immutable = change_request.status in IMMUTABLE_STATUSES
+    ttl = timedelta(seconds=settings.SAP_CONTENT_CACHE_TTL)
+    cached = await crud.sap_content.read_fresh(
+        session=session,
+        change_request_number=number,
+        ttl=ttl,
+    )
+    if cached is not None:
+        metrics.increment("sap_content_cache_hits")
+        return decode(cached)
+
+    metrics.increment("sap_content_cache_misses")
+    async with outside_transaction(session):
+        content = await (fetch or fetch_from_sap)(number)
+    if not isinstance(content, list):
+        # Never cached, a released change request would keep the bad content forever
+        metrics.increment("sap_content_fetch_failed")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="SAP returned no content for the change request",
+        )
+    await crud.sap_content.store(
+        session=session,
+        change_request_number=number,
+        content=encode(content),
+        immutable=immutable,
+    )
+    if not immutable:
+        evicted = await crud.sap_content.evict(
+            session=session,
+            ttl=ttl,
+            max_bytes=settings.SAP_CONTENT_CACHE_MAX_BYTES,
+        )
+        metrics.increment("sap_content_cache_evicted", evicted)
+    sizes = await crud.sap_content.read_sizes(session=session)
+    metrics.set("sap_content_cache_immutable_bytes", sizes.get(True, 0))
+    metrics.set("sap_content_cache_modifiable_bytes", sizes.get(False, 0))
+    return content
@@ -0,0 +1,32 @@
+"""
+Builds the lean responses of sparse fieldsets (the `fields` query parameter, see deps.get_fields).
+"""
+
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Type
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, create_model
+
+
+@lru_cache(maxsize=128)
+def partial_schema(schema: Type[BaseModel], fields: tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Returns a copy of the schema with the requested fields only, validating an ORM object through it
+    never touches the attributes which were not loaded.
+    """
+    return create_model(
+        f"Partial{schema.__name__}",
+        __config__=schema.__config__,
+        **{field: (Optional[schema.__fields__[field].outer_type_], None) for field in fields},
+    )
+
+
+def sparse_response(content: Any, schema: Type[BaseModel], fields: Sequence[str]) -> JSONResponse:
+    model = partial_schema(schema, tuple(fields))
+    if isinstance(content, list):
+        data = [model.from_orm(obj) for obj in content]
+    else:
+        data = model.from_orm(content)
+    return JSONResponse(content=jsonable_encoder(data, exclude_none=True))
@@ -0,0 +1,27 @@
+"""
+Defines the in-process metrics registry, exposed by the /metrics endpoint.
+
+Values are per worker (process), sum them up across the workers when scraping.
+"""
+
+from collections import defaultdict
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._values: dict[str, float] = defaultdict(int)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        self._values[name] += value
+
+    def set(self, name: str, value: float) -> None:
+        self._values[name] = value
+
+    def get(self, name: str) -> float:
+        return self._values.get(name, 0)
+
+    def snapshot(self) -> dict[str, float]:
+        return dict(sorted(self._values.items()))
+
+
+metrics = Metrics()
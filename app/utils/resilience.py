@@ -0,0 +1,120 @@
+"""
+Protects the calls to external services (SAP) from their slowness and failures.
+
+`CircuitBreaker` fails the calls fast while the service is unhealthy: it opens after
+`failure_threshold` consecutive failures, and after `reset_timeout` seconds lets a single trial
+call through (half-open) which closes it again on success.
+
+`hedge` sends a duplicate of a slow idempotent call and returns whichever finishes first, trading
+some extra load for a shorter tail latency.
+"""
+
+import asyncio
+import time
+from enum import Enum
+from typing import Awaitable, Callable, TypeVar
+
+from app.utils.metrics import metrics
+
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"{name} is unavailable, retry in {retry_after:.0f} seconds")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = CircuitState.closed
+        self._trial_running = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.open and self.clock() - self.opened_at >= self.reset_timeout:
+            self._set_state(CircuitState.half_open)
+        return self._state
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        metrics.increment(f"{self.name}_circuit_{state.value}")
+        metrics.set(f"{self.name}_circuit_state", list(CircuitState).index(state))
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        state = self.state
+        if state == CircuitState.open or (state == CircuitState.half_open and self._trial_running):
+            metrics.increment(f"{self.name}_circuit_rejected")
+            retry_after = max(self.reset_timeout - (self.clock() - self.opened_at), 0)
+            raise CircuitOpenError(self.name, retry_after=retry_after)
+
+        trial = state == CircuitState.half_open
+        if trial:
+            # Only the trial call goes through until it tells whether the service recovered
+            self._trial_running = True
+        try:
+            result = await fn()
+        except Exception:
+            self._record_failure()
+            raise
+        else:
+            self._record_success()
+            return result
+        finally:
+            if trial:
+                self._trial_running = False
+
+    def _record_failure(self) -> None:
+        self.failures += 1
+        if self._state == CircuitState.half_open or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+            self._set_state(CircuitState.open)
+
+    def _record_success(self) -> None:
+        self.failures = 0
+        if self._state != CircuitState.closed:
+            self._set_state(CircuitState.closed)
+
+
+async def hedge(fn: Callable[[], Awaitable[T]], delay: float, name: str) -> T:
+    """
+    Calls `fn`, and calls it again if it didn't finish within `delay` seconds. Returns the first
+    successful result (or the last failure), the other call is cancelled. Only for idempotent calls.
+    """
+    calls = [asyncio.ensure_future(fn())]
+    done, _ = await asyncio.wait(calls, timeout=delay)
+    if not done:
+        metrics.increment(f"{name}_hedged")
+        calls.append(asyncio.ensure_future(fn()))
+    try:
+        pending = set(calls)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [call for call in done if call.exception() is None]
+            if succeeded or not pending:
+                call = (succeeded or list(done))[0]
+                if len(calls) > 1 and call is calls[-1]:
+                    metrics.increment(f"{name}_hedge_won")
+                return call.result()
+    finally:
+        for call in calls:
+            call.cancel()
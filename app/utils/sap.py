@@ -1,14 +1,77 @@
-from typing import Union
+from typing import Any, Optional, Union
 
-from httpx import AsyncClient
+from httpx import AsyncClient, Response
 
 from app import schemas
 from app.config import settings
+from app.utils.resilience import CircuitBreaker, hedge
+
+
+# Shared by the whole worker, so the connections to SAP are reused across requests
+_client: Optional[AsyncClient] = None
+
+# Fails the calls fast while SAP is unhealthy, instead of tying up the workers waiting for it
+breaker = CircuitBreaker(
+    name="sap",
+    failure_threshold=settings.SAP_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.SAP_CIRCUIT_RESET_TIMEOUT,
+)
+
+
+def get_client() -> AsyncClient:
+    global _client
+    if _client is None:
+        _client = AsyncClient(timeout=settings.SAP_TIMEOUT)
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def warm_up() -> None:
+    # Opens the connection to SAP (and its TLS handshake) before the first request needs it
+    await fetch_auth_headers_and_cookies(client=get_client())
+
+
+async def request(
+    client: AsyncClient,
+    method: str,
+    url: str,
+    operation: str,
+    idempotent: bool = False,
+    **kwargs: Any,
+) -> Response:
+    """
+    Sends a request to SAP through the circuit breaker, with the operation's timeout. Server errors
+    and timeouts count as failures. Idempotent requests are hedged when SAP_HEDGE_DELAY is set.
+    """
+    timeout = settings.SAP_TIMEOUTS.get(operation, settings.SAP_TIMEOUT)
+
+    async def send() -> Response:
+        response = await client.request(method=method, url=url, timeout=timeout, **kwargs)
+        if response.is_server_error:
+            response.raise_for_status()
+        return response
+
+    async def call() -> Response:
+        if idempotent and settings.SAP_HEDGE_DELAY is not None:
+            return await hedge(send, delay=settings.SAP_HEDGE_DELAY, name=f"sap_{operation}")
+        return await send()
+
+    return await breaker.call(call)
 
 
 async def fetch_auth_headers_and_cookies(client: AsyncClient) -> dict[str, Union[str, list[str]]]:
-    response = await client.get(
+    response = await request(
+        client=client,
+        method="GET",
         url=settings.SAP_AUTH_URL,
+        operation="auth",
+        idempotent=True,
         headers={
             "Authorization": settings.SAP_BASIC_AUTH_HEADER,
             "Content-Type": "application/json",
@@ -34,5 +97,16 @@ async def delete_change_request() -> None:
     pass
 
 
-async def fetch_change_request_content(client: AsyncClient):
+async def fetch_change_request_content(
+    client: AsyncClient,
+    change_request_number: str,
+) -> list[schemas.ChangeRequestObjectCreate]:
+    # Should return the change request's object list (E071 entries), to be stored with
+    # crud.change_request_object.replace_many
+    pass
+
+
+async def import_change_request(client: AsyncClient, change_request_number: str) -> None:
+    # Should import the change request to the target system, the imports of a branch are
+    # scheduled with app.utils.scheduler.run_plan
     pass
@@ -0,0 +1,81 @@
+"""
+Orders the imports of a branch's change requests.
+
+A change request depends on the earlier change requests that transport one of its objects (they
+must be imported before it, or the target system ends up with the older version). The dependencies
+form a DAG (edges always point back in creation order), which is split into waves: every change
+request of a wave depends only on change requests of previous waves, so a wave can be imported in
+parallel, up to the available import slots.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Iterable
+
+from app.utils.metrics import metrics
+
+
+Importer = Callable[[str], Awaitable[None]]
+
+
+class ImportFailed(Exception):
+    def __init__(self, failures: dict[str, BaseException]) -> None:
+        super().__init__(f"failed to import change requests: {sorted(failures)}")
+        self.failures = failures
+
+
+def plan_waves(numbers: list[str], dependencies: Iterable[tuple[str, str]]) -> list[list[str]]:
+    """
+    Topologically sorts the change requests (Kahn's algorithm) level by level, `numbers` order
+    (creation order) is kept inside each wave. `dependencies` holds (number, depends_on) pairs,
+    the ones of change requests missing from `numbers` are skipped (added to the branch after the
+    numbers were read).
+    """
+    dependents: dict[str, list[str]] = {number: [] for number in numbers}
+    pending = dict.fromkeys(numbers, 0)
+    for number, depends_on in dependencies:
+        if number not in pending or depends_on not in pending:
+            continue
+        dependents[depends_on].append(number)
+        pending[number] += 1
+
+    position = {number: index for index, number in enumerate(numbers)}
+    waves = []
+    wave = [number for number in numbers if not pending[number]]
+    while wave:
+        waves.append(wave)
+        ready = []
+        for number in wave:
+            for dependent in dependents[number]:
+                pending[dependent] -= 1
+                if not pending[dependent]:
+                    ready.append(dependent)
+        wave = sorted(ready, key=position.__getitem__)
+
+    if sum(map(len, waves)) != len(numbers):
+        raise ValueError("the import dependencies contain a cycle")
+    return waves
+
+
+async def run_plan(waves: list[list[str]], importer: Importer, slots: int) -> None:
+    """
+    Imports the waves one after the other, each with up to `slots` concurrent imports. A wave
+    with failed imports stops the plan (once its other imports finished), as the next waves may
+    depend on them.
+    """
+    semaphore = asyncio.Semaphore(slots)
+
+    async def run(number: str) -> None:
+        async with semaphore:
+            await importer(number)
+            metrics.increment("imports_executed")
+
+    for wave in waves:
+        results = await asyncio.gather(*map(run, wave), return_exceptions=True)
+        failures = {
+            number: result
+            for number, result in zip(wave, results)
+            if isinstance(result, BaseException)
+        }
+        if failures:
+            metrics.increment("imports_failed", len(failures))
+            raise ImportFailed(failures)
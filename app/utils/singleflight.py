@@ -0,0 +1,40 @@
+"""
+Coalesces concurrent identical calls onto a single execution (single-flight).
+
+The first caller of a key executes the call, callers arriving while it is in flight wait for it and
+share its result (or exception) instead of executing it again.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.utils.metrics import metrics
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Returns the call result and whether it was shared with (executed by) another caller.
+        """
+        call = self._calls.get(key)
+        if call is not None:
+            metrics.increment(f"{self.name}_coalesced")
+            return await asyncio.shield(call), True
+
+        call = asyncio.ensure_future(fn())
+        self._calls[key] = call
+        call.add_done_callback(lambda _: self._forget(key, call))
+        metrics.increment(f"{self.name}_executed")
+        # Shielded, so a cancelled caller doesn't cancel the call for the ones waiting on it
+        return await asyncio.shield(call), False
+
+    def _forget(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
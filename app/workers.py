@@ -0,0 +1,16 @@
+"""
+Defines the uvicorn worker class used by gunicorn in production mode.
+"""
+
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+from app.config import settings
+
+
+class UvicornWorker(BaseUvicornWorker):
+    # Gunicorn settings cover the rest (keep-alive, backlog, max requests), see gunicorn.conf.py
+    CONFIG_KWARGS = {
+        "loop": settings.SERVER_LOOP,
+        "http": settings.SERVER_HTTP,
+        "access_log": settings.SERVER_ACCESS_LOG,
+    }
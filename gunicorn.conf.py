@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration (production mode), every value comes from the server settings.
+"""
+
+from app.config import settings
+
+
+bind = f"{settings.SERVER_HOST}:{settings.SERVER_PORT}"
+backlog = settings.SERVER_BACKLOG
+# The uvicorn workers rewrite the client address from these proxies' X-Forwarded-For
+forwarded_allow_ips = settings.SERVER_FORWARDED_ALLOW_IPS
+
+# Async workers, one per core is enough to saturate the host
+workers = settings.SERVER_WORKERS
+worker_class = "app.workers.UvicornWorker"
+keepalive = settings.SERVER_KEEP_ALIVE
+timeout = settings.SERVER_TIMEOUT
+
+# Graceful worker recycling
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+
+loglevel = settings.SERVER_LOG_LEVEL
+errorlog = "-"
+accesslog = "-" if settings.SERVER_ACCESS_LOG else None
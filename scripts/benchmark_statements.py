@@ -0,0 +1,76 @@
+"""
+Measures the per call Python overhead of the hot CRUD statements: building the statement and its
+cache key (what SQLAlchemy does on every execution before looking up the compiled statement), for
+the lambda statements used by the CRUD layer against the equivalent plain constructs.
+
+Usage: python -m scripts.benchmark_statements [calls]
+"""
+
+import sys
+import timeit
+from uuid import uuid4
+
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from app import crud
+from app.models import Branch, ChangeRequest
+
+
+def plain_read(obj_id, fields):
+    return select(Branch).where(Branch.id == obj_id).options(*crud.branch.load_options(fields))
+
+
+def plain_read_with_branch_id(obj_id, branch_id, fields):
+    return (
+        select(ChangeRequest)
+        .where(ChangeRequest.number == obj_id, ChangeRequest.branch_id == branch_id)
+        .options(*crud.change_request.load_options(fields))
+    )
+
+
+def plain_bulk_update_branch_id(source_branch_id, target_branch_id, objs_ids):
+    return (
+        update(ChangeRequest)
+        .where(ChangeRequest.number.in_(objs_ids), ChangeRequest.branch_id == source_branch_id)
+        .values(branch_id=target_branch_id)
+    )
+
+
+BENCHMARKS = {
+    "read": (
+        lambda: plain_read(uuid4(), None),
+        lambda: crud.branch.read_statement(uuid4(), None),
+    ),
+    "read (fields)": (
+        lambda: plain_read(uuid4(), ["id", "title"]),
+        lambda: crud.branch.read_statement(uuid4(), ["id", "title"]),
+    ),
+    "read_with_branch_id": (
+        lambda: plain_read_with_branch_id("CD1K900001", uuid4(), None),
+        lambda: crud.change_request.read_with_branch_id_statement("CD1K900001", uuid4(), None),
+    ),
+    "bulk_update_branch_id": (
+        lambda: plain_bulk_update_branch_id(uuid4(), uuid4(), ["CD1K900001", "CD1K900002"]),
+        lambda: crud.change_request.bulk_update_branch_id_statement(
+            uuid4(), uuid4(), ["CD1K900001", "CD1K900002"]
+        ),
+    ),
+}
+
+
+def measure(build, calls: int) -> float:
+    build()._generate_cache_key()  # warm up the caches
+    seconds = timeit.timeit(lambda: build()._generate_cache_key(), number=calls)
+    return seconds / calls * 1_000_000
+
+
+def main(calls: int) -> None:
+    print(f"{'statement':<24}{'plain (us)':>12}{'lambda (us)':>13}{'speedup':>9}")
+    for name, (plain, cached) in BENCHMARKS.items():
+        plain_us, cached_us = measure(plain, calls), measure(cached, calls)
+        print(f"{name:<24}{plain_us:>12.1f}{cached_us:>13.1f}{plain_us / cached_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(calls=int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -5,39 +5,12 @@ set -o errexit
 set -o pipefail
 set -o nounset
 
-# dependent services health check (postgres)
-is_postgres_alive() {
-    python << END
-import asyncio
-import sys
+# startup profile mode, python reports the import time of every module to stderr
+if [[ "${STARTUP_PROFILE:-false}" =~ ^([Tt]rue|1|yes|on)$ ]]; then
+    export PYTHONPROFILEIMPORTTIME=1
+fi
 
-import asyncpg
-
-
-async def main():
-    try:
-        conn = await asyncpg.connect(
-            host="${POSTGRES_HOST}",
-            port="${POSTGRES_PORT}",
-            user="${POSTGRES_USER}",
-            password="${POSTGRES_PASSWORD}",
-            database="${POSTGRES_DB}",
-        )
-    except OSError:
-        sys.exit(-1)
-
-
-asyncio.run(main())
-END
-}
-
-until is_postgres_alive; do
-    >&2 echo "Waiting for PostgreSQL to become available..."
-    sleep 2
-done
->&2 echo "PostgreSQL is available"
-
-# run migrations
-alembic upgrade head
+# wait for the dependent services (postgres) and run the migrations when behind head
+python -m app.prestart
 
 exec "$@"
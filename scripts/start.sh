@@ -1,20 +1,9 @@
- #!/bin/bash
+#!/bin/bash
 
-# start fastapi server using uvicorn
+# start fastapi server, the server options are read from the settings (app/config.py)
 if [ "$FASTAPI_ENV" = "DEV" ]; then
-    uvicorn \
-        --reload \
-        --host 0.0.0.0 \
-        --port 8000 \
-        --workers 2 \
-        --log-level "debug" \
-        app.main:app
+    exec python -m app.server --reload
 
 else
-    uvicorn \
-        --host 0.0.0.0 \
-        --port 8000 \
-        --workers 2 \
-        --log-level "debug" \
-        app.main:app
-fi
\ No newline at end of file
+    exec gunicorn --config gunicorn.conf.py app.main:app
+fi
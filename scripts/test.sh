@@ -3,4 +3,5 @@
 set -e
 set -x
 
-pytest tests --asyncio-mode=strict
+# one process per core (pytest-xdist), each on its own clone of the migrated template database
+pytest tests --asyncio-mode=strict -n "${TEST_WORKERS:-auto}"
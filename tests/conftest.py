@@ -4,9 +4,15 @@ import pytest_asyncio
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import engine
-from app.deps import get_session
-from app.main import app
+from app.config import settings
+from tests import database
+
+# Every worker runs on a database of its own, set before the engine is created (by app.db)
+settings.SQLALCHEMY_DATABASE_URL = database.worker_url(settings.SQLALCHEMY_DATABASE_URL)
+
+from app.db import BatchSession, engine  # noqa: E402
+from app.deps import get_batch_session, get_session  # noqa: E402
+from app.main import app  # noqa: E402
 
 
 @pytest.fixture(scope="session")
@@ -17,6 +23,14 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def test_database(event_loop) -> str:
+    event_loop.run_until_complete(database.create(settings.SQLALCHEMY_DATABASE_URL))
+    yield settings.SQLALCHEMY_DATABASE_URL
+    event_loop.run_until_complete(engine.dispose())
+    event_loop.run_until_complete(database.drop(settings.SQLALCHEMY_DATABASE_URL))
+
+
 @pytest_asyncio.fixture(scope="function")
 async def override_get_session() -> AsyncSession:
     # establish database connection
@@ -38,8 +52,21 @@ async def session(override_get_session) -> AsyncSession:
 
 
 @pytest_asyncio.fixture(scope="function")
-async def client(override_get_session) -> AsyncClient:
+async def override_get_batch_session(override_get_session) -> BatchSession:
+    connection = override_get_session.bind
+    # begin a savepoint, the batch commits (or rolls back) it instead of the test transaction
+    await connection.begin_nested()
+    session = BatchSession(bind=connection, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def client(override_get_session, override_get_batch_session) -> AsyncClient:
     app.dependency_overrides[get_session] = lambda: override_get_session
+    app.dependency_overrides[get_batch_session] = lambda: override_get_batch_session
     async with AsyncClient(
         app=app,
         base_url="http://localhost:8000",
@@ -0,0 +1,107 @@
+"""
+Gives every test process (pytest-xdist worker) its own database, so the suite runs in parallel.
+
+The migrations run once, into a template database named after the migrations head. Each worker
+clones it (`CREATE DATABASE ... TEMPLATE`, a file level copy which is much faster than migrating)
+into a database of its own, and drops it when done. A changed head gets a new template, the stale
+ones are dropped.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import asyncpg
+from sqlalchemy.engine import URL, make_url
+
+from app.prestart import read_head_revisions
+
+
+ROOT = Path(__file__).parent.parent
+# Serializes the template creation between the workers
+TEMPLATE_LOCK = 7_040_047
+
+
+def worker_url(url: str) -> str:
+    """
+    Returns the URL of the current worker's database ("main" when not running under xdist).
+    """
+    url = make_url(url)
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return str(url.set(database=f"{url.database}_test_{worker}"))
+
+
+def base_database(url: URL) -> str:
+    # The configured database, the worker's one is named after it
+    return url.database.rsplit("_test_", 1)[0]
+
+
+def template_name(url: URL) -> str:
+    return f"{base_database(url)}_template_{'_'.join(sorted(read_head_revisions()))}"
+
+
+async def connect(url: URL) -> asyncpg.Connection:
+    # Databases can't be created or dropped while connected to them, so through the base one
+    return await asyncpg.connect(
+        host=url.host,
+        port=url.port,
+        user=url.username,
+        password=url.password,
+        database=base_database(url),
+    )
+
+
+def migrate(url: URL) -> None:
+    # A process of its own, alembic's env.py reads the database from the settings
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT,
+        env={**os.environ, "SQLALCHEMY_DATABASE_URL": str(url)},
+        check=True,
+        capture_output=True,
+    )
+
+
+async def ensure_template(connection: asyncpg.Connection, url: URL) -> str:
+    template = template_name(url)
+    await connection.execute("SELECT pg_advisory_lock($1)", TEMPLATE_LOCK)
+    try:
+        templates = await connection.fetch(
+            "SELECT datname FROM pg_database WHERE datname LIKE $1",
+            f"{base_database(url)}_template_%",
+        )
+        names = {row["datname"] for row in templates}
+        if template not in names:
+            # Migrated under another name first, a failed migration doesn't leave a template
+            building = f"{template}_building"
+            await connection.execute(f'DROP DATABASE IF EXISTS "{building}"')
+            await connection.execute(f'CREATE DATABASE "{building}"')
+            await asyncio.to_thread(migrate, url.set(database=building))
+            await connection.execute(f'ALTER DATABASE "{building}" RENAME TO "{template}"')
+        for stale in names - {template}:
+            await connection.execute(f'DROP DATABASE IF EXISTS "{stale}" WITH (FORCE)')
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock($1)", TEMPLATE_LOCK)
+    return template
+
+
+async def create(url: str) -> None:
+    url = make_url(url)
+    connection = await connect(url)
+    try:
+        template = await ensure_template(connection, url)
+        await connection.execute(f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)')
+        await connection.execute(f'CREATE DATABASE "{url.database}" TEMPLATE "{template}"')
+    finally:
+        await connection.close()
+
+
+async def drop(url: str) -> None:
+    url = make_url(url)
+    connection = await connect(url)
+    try:
+        await connection.execute(f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)')
+    finally:
+        await connection.close()
@@ -0,0 +1,61 @@
+"""
+Factories of seed data for the tests, inserted with multi-row INSERTs so large data sets (for the
+performance tests) take a few statements instead of a flush per object.
+"""
+
+import itertools
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.db import insert_many
+
+
+# Change request numbers are unique across the branches, so they are drawn from a shared counter
+numbers = itertools.count(1)
+
+
+def branch_rows(count: int, **values: Any) -> list[dict[str, Any]]:
+    return [
+        {"title": f"Branch {index}", "description": "Seeded branch", **values}
+        for index in range(count)
+    ]
+
+
+def change_request_rows(branch_id: UUID, count: int, **values: Any) -> list[dict[str, Any]]:
+    return [
+        {
+            "number": f"CD1S{next(numbers):06}",
+            "type": "K",
+            "status": "D",
+            "description": "Seeded change request",
+            "branch_id": branch_id,
+            **values,
+        }
+        for _ in range(count)
+    ]
+
+
+async def create_branches(
+    session: AsyncSession,
+    count: int,
+    change_requests_per_branch: int = 0,
+    **values: Any,
+) -> list[UUID]:
+    """
+    Creates `count` branches with `change_requests_per_branch` change requests each, returns the
+    branches ids.
+    """
+    branches_ids = await insert_many(
+        session, models.Branch, branch_rows(count, **values), returning=models.Branch.id
+    )
+    rows = [
+        row
+        for branch_id in branches_ids
+        for row in change_request_rows(branch_id, change_requests_per_branch)
+    ]
+    await insert_many(session, models.ChangeRequest, rows)
+    await session.commit()
+    return branches_ids
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app as main_app
+from app.middleware import AdmissionMiddleware, ConcurrencyLimit, TokenBucket
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_app(release: asyncio.Event, queue_size: int, rate_limit: TokenBucket = None) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware,
+        reads=ConcurrencyLimit(name="test_reads", limit=1, queue_size=queue_size, queue_timeout=5),
+        writes=ConcurrencyLimit(name="test_writes", limit=1, queue_size=0, queue_timeout=5),
+        rate_limit=rate_limit,
+    )
+
+    @app.get("/slow")
+    async def slow_read():
+        await release.wait()
+        return {"done": True}
+
+    @app.post("/slow")
+    async def slow_write():
+        await release.wait()
+        return {"done": True}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_admission_queues_then_sheds_excess_requests():
+    # Arrange
+    release = asyncio.Event()
+    app = create_app(release, queue_size=1)
+    async with AsyncClient(app=app, base_url="http://localhost:8000") as client:
+        running = asyncio.create_task(client.get("/slow"))
+        queued = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.05)
+        # Act
+        shed = await client.get("/slow")
+        write = asyncio.create_task(client.post("/slow"))
+        await asyncio.sleep(0.05)
+        release.set()
+        # Assert
+        assert shed.status_code == 503
+        assert int(shed.headers["Retry-After"]) >= 1
+        assert (await running).status_code == 200
+        assert (await queued).status_code == 200
+        assert (await write).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_queued_request_is_shed_after_deadline():
+    # Arrange
+    limit = ConcurrencyLimit(name="test_deadline", limit=1, queue_size=1, queue_timeout=0.01)
+    await limit.acquire()
+    # Act
+    admitted = await limit.acquire()
+    # Assert
+    assert admitted is False
+    assert limit.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_rejects_client_over_its_bucket():
+    # Arrange
+    release = asyncio.Event()
+    release.set()
+    clock = Clock()
+    app = create_app(release, queue_size=1, rate_limit=TokenBucket(rate=1, burst=2, clock=clock))
+    other_transport = ASGITransport(app=app, client=("10.0.0.2", 123))
+    base_url = "http://localhost:8000"
+    async with AsyncClient(app=app, base_url=base_url) as client:
+        async with AsyncClient(transport=other_transport, base_url=base_url) as other:
+            # Act
+            statuses = [(await client.get("/slow")).status_code for _ in range(3)]
+            spoofed = await client.get("/slow", headers={"X-Forwarded-For": "10.0.0.3"})
+            other_client = await other.get("/slow")
+            clock.now = 1
+            refilled = await client.get("/slow")
+    # Assert
+    assert statuses == [200, 200, 429]
+    assert spoofed.status_code == 429
+    assert other_client.status_code == 200
+    assert refilled.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_rejections_carry_the_cors_headers():
+    # Arrange
+    release = asyncio.Event()
+    app = create_app(release, queue_size=0)
+    # The application's CORS middleware wraps all the others, admission included
+    cors = main_app.user_middleware[0]
+    assert cors.cls is CORSMiddleware
+    app.add_middleware(CORSMiddleware, **cors.options)
+    headers = {"Origin": "http://client.example"}
+    async with AsyncClient(app=app, base_url="http://localhost:8000") as client:
+        running = asyncio.create_task(client.get("/slow", headers=headers))
+        await asyncio.sleep(0.05)
+        # Act
+        shed = await client.get("/slow", headers=headers)
+        release.set()
+        await running
+    # Assert
+    assert shed.status_code == 503
+    assert shed.headers["Access-Control-Allow-Origin"] in ("*", "http://client.example")
+    assert "retry-after" in shed.headers["Access-Control-Expose-Headers"].lower()
@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.jobs.archive import archive_change_requests
+
+
+data = {
+    "branch": {"title": "Q1 release", "description": "Released long ago"},
+    "change_requests": [
+        {"number": "CD1K900001", "status": "R", "created_at": datetime(2024, 1, 15)},
+        {"number": "CD1K900002", "status": "D", "created_at": datetime(2024, 1, 20)},
+        {"number": "CD1K900003", "status": "N", "created_at": datetime(2024, 2, 10)},
+        {"number": "CD1K900004", "status": "R", "created_at": datetime(2025, 3, 1)},
+    ],
+    "before": datetime(2025, 1, 1, tzinfo=timezone.utc),
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch_id(session: AsyncSession) -> str:
+    branch = await crud.branch.create(
+        session=session, in_obj=schemas.BranchCreate(**data["branch"])
+    )
+    branch_id = str(branch.id)
+    for change_request in data["change_requests"]:
+        created_at = change_request["created_at"].replace(tzinfo=timezone.utc)
+        session.add(
+            models.ChangeRequest(
+                **{**change_request, "created_at": created_at},
+                type="K",
+                branch_id=branch_id,
+            )
+        )
+    await session.commit()
+    return branch_id
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_old_released_change_requests_in_batches(
+    session: AsyncSession,
+    branch_id: str,
+):
+    # Act
+    archived = await archive_change_requests(session, before=data["before"], batch_size=1)
+    # Assert
+    assert archived == 2
+    partitions = await session.execute(
+        text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = 'change_request_archive'::regclass ORDER BY 1"
+        )
+    )
+    assert partitions.scalars().all() == [
+        "change_request_archive_y2024m01",
+        "change_request_archive_y2024m02",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_archive_creates_the_partition_of_a_change_request_released_meanwhile(
+    session: AsyncSession,
+    branch_id: str,
+):
+    # Arrange
+    await archive_change_requests(session, before=data["before"], batch_size=10)
+    session.add(
+        models.ChangeRequest(
+            number="CD1K900005",
+            status="R",
+            type="K",
+            created_at=datetime(2024, 6, 5, tzinfo=timezone.utc),
+            branch_id=branch_id,
+        )
+    )
+    await session.commit()
+    # Act
+    numbers = await crud.change_request_archive.archive_batch(
+        session=session, before=data["before"], size=10
+    )
+    # Assert
+    assert numbers == ["CD1K900005"]
+    partition = await session.execute(text("SELECT to_regclass('change_request_archive_y2024m06')"))
+    assert partition.scalar_one() == "change_request_archive_y2024m06"
+
+
+@pytest.mark.asyncio
+async def test_read_branch_includes_archive_only_when_asked(
+    client: AsyncClient,
+    session: AsyncSession,
+    branch_id: str,
+):
+    # Arrange
+    await archive_change_requests(session, before=data["before"], batch_size=10)
+    # Act
+    hot = await client.get(f"/branches/{branch_id}")
+    everything = await client.get(
+        f"/branches/{branch_id}", params={"include_archived": True, "fields": "change_requests"}
+    )
+    # Assert
+    assert [cr["number"] for cr in hot.json()["change_requests"]] == ["CD1K900002", "CD1K900004"]
+    assert [cr["number"] for cr in everything.json()["change_requests"]] == [
+        "CD1K900001",
+        "CD1K900003",
+        "CD1K900002",
+        "CD1K900004",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_change_request_falls_back_to_archive_when_asked(
+    client: AsyncClient,
+    session: AsyncSession,
+    branch_id: str,
+):
+    # Arrange
+    await archive_change_requests(session, before=data["before"], batch_size=10)
+    url = f"/branches/{branch_id}/change-requests/CD1K900001"
+    # Act
+    hot = await client.get(url)
+    archived = await client.get(url, params={"include_archived": True})
+    # Assert
+    assert hot.status_code == 404
+    assert archived.status_code == 200
+    assert archived.json()["status"] == "R"
+
+
+@pytest.mark.asyncio
+async def test_archive_leaves_tombstones_and_drops_objects(
+    client: AsyncClient,
+    session: AsyncSession,
+    branch_id: str,
+):
+    # Arrange
+    since = (await client.get("/changes/")).json()["next_token"]
+    await crud.change_request_object.replace_many(
+        session=session,
+        change_request_number="CD1K900001",
+        in_objs=[
+            schemas.ChangeRequestObjectCreate(
+                pgmid="R3TR", object_type="PROG", object_name="ZARCHIVED"
+            )
+        ],
+    )
+    # Act
+    await archive_change_requests(session, before=data["before"], batch_size=10)
+    # Assert
+    changes = (await client.get("/changes/", params={"since": since})).json()
+    assert sorted(
+        tombstone["key"]
+        for tombstone in changes["deleted"]
+        if tombstone["entity"] == "change_request"
+    ) == ["CD1K900001", "CD1K900003"]
+    objects = await crud.change_request_object.read_many_by_change_request(
+        session=session, change_request_number="CD1K900001"
+    )
+    assert objects == []
@@ -0,0 +1,172 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.db import async_session
+from app.utils import audit
+from app.utils.audit import AuditWriter, audit_writer
+
+
+data = {
+    "branch": {"title": "Release sprint 43", "description": "Audited"},
+    "change_requests": ["CD1K910001", "CD1K910002"],
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch_id(session: AsyncSession) -> str:
+    audit_writer.buffer.clear()
+    branch = await crud.branch.create(
+        session=session, in_obj=schemas.BranchCreate(**data["branch"])
+    )
+    branch_id = str(branch.id)
+    for number in data["change_requests"]:
+        await crud.change_request.create(
+            session=session,
+            in_obj=schemas.ChangeRequestCreate(
+                number=number, status="D", description="Audited", type="K"
+            ),
+            branch_id=branch_id,
+        )
+    return branch_id
+
+
+@pytest.mark.asyncio
+async def test_audit_log_records_branch_mutations(
+    client: AsyncClient,
+    session: AsyncSession,
+    branch_id: str,
+):
+    # Arrange
+    await client.patch(url=f"/branches/{branch_id}", json={"title": "Release sprint 44"})
+    await audit_writer.flush(session=session)
+    # Act
+    response = await client.get(url="/audit/", params={"entity": "branch", "key": branch_id})
+    # Assert
+    assert response.status_code == 200
+    entries = response.json()
+    assert [entry["action"] for entry in entries] == ["update", "create"]
+    assert entries[0]["changes"] == {"title": ["Release sprint 43", "Release sprint 44"]}
+    assert entries[1]["changes"]["title"] == [None, "Release sprint 43"]
+
+
+@pytest.mark.asyncio
+async def test_audit_log_records_bulk_mutations(
+    client: AsyncClient,
+    session: AsyncSession,
+    branch_id: str,
+):
+    # Arrange
+    await client.post(
+        url=f"/branches/{branch_id}/change-requests/transition",
+        json={"numbers": data["change_requests"], "status": "R"},
+    )
+    await audit_writer.flush(session=session)
+    # Act
+    response = await client.get(
+        url="/audit/", params={"entity": "change_request", "key": "CD1K910001"}
+    )
+    # Assert
+    assert [(entry["action"], entry["changes"]) for entry in response.json()] == [
+        ("update", {"status": ["D", "R"]}),
+        (
+            "create",
+            {
+                "branch_id": [None, branch_id],
+                "description": [None, "Audited"],
+                "number": [None, "CD1K910001"],
+                "status": [None, "D"],
+                "type": [None, "K"],
+            },
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_audit_log_pages_with_before(
+    client: AsyncClient,
+    session: AsyncSession,
+    branch_id: str,
+):
+    # Arrange
+    await audit_writer.flush(session=session)
+    newest = (await client.get(url="/audit/", params={"limit": 1})).json()
+    # Act
+    response = await client.get(url="/audit/", params={"before": newest[0]["id"], "limit": 1})
+    # Assert
+    assert [entry["id"] for entry in response.json()] == [newest[0]["id"] - 1]
+
+
+@pytest.mark.asyncio
+async def test_audit_entries_are_dropped_on_rollback():
+    # Arrange
+    audit_writer.buffer.clear()
+    async with async_session() as session:
+        await session.execute(text("SELECT 1"))
+        audit.record(session, "delete", "branch", "rolled-back")
+        # Act
+        await session.rollback()
+        audit.record(session, "delete", "branch", "committed")
+        await session.commit()
+    # Assert
+    assert [entry["key"] for entry in audit_writer.buffer] == ["committed"]
+    audit_writer.buffer.clear()
+
+
+@pytest.mark.asyncio
+async def test_audit_writer_bounds_its_buffer(session: AsyncSession):
+    # Arrange
+    writer = AuditWriter(batch_size=2, flush_interval=1, max_buffered=3)
+    entries = [
+        {
+            "occurred_at": datetime.now(tz=timezone.utc),
+            "action": "create",
+            "entity": "branch",
+            "key": f"bounded-{index}",
+            "changes": {},
+        }
+        for index in range(4)
+    ]
+    # Act
+    writer.add(entries)
+    written = await writer.flush(session=session)
+    # Assert
+    assert written == 3
+    assert writer.buffer == []
+    rows = await crud.audit_entry.read_many_filtered(session=session, entity="branch")
+    assert [row.key for row in rows if row.key.startswith("bounded-")] == [
+        "bounded-2",
+        "bounded-1",
+        "bounded-0",
+    ]
+    assert isinstance(rows[0], models.AuditEntry)
+
+
+@pytest.mark.asyncio
+async def test_audit_writer_stop_waits_for_the_insert_in_progress():
+    # Arrange
+    writer = AuditWriter(batch_size=1, flush_interval=60, max_buffered=10)
+    inserting = asyncio.Event()
+    written = []
+
+    async def slow_insert(session: AsyncSession, entries: list[dict]) -> None:
+        inserting.set()
+        await asyncio.sleep(0.05)
+        written.extend(entries)
+
+    writer._insert = slow_insert
+    writer.start()
+    writer.add([{"key": "in-progress"}])
+    await inserting.wait()
+    writer.add([{"key": "buffered"}])
+    # Act
+    await writer.stop()
+    # Assert
+    assert [entry["key"] for entry in written] == ["in-progress", "buffered"]
+    assert writer.buffer == []
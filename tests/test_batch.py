@@ -0,0 +1,126 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+
+
+data = {
+    "branch1": {
+        "title": "Add batch operations endpoint",
+        "description": "Execute many operations in a single request and transaction.",
+    },
+    "branch2": {
+        "title": "Add batch references",
+        "description": "Reference branches created earlier in the batch.",
+    },
+    "change_request1": {
+        "number": "CD1K9A7D7S",
+        "status": "D",
+        "description": "BC-Fishman-CICD Workbench Testing CR",
+        "type": "K",
+    },
+    "change_request2": {
+        "number": "CD1L9A7D7L",
+        "status": "D",
+        "description": "BC-Fishman-CICD TransportOfCopies Testing CR",
+        "type": "T",
+    },
+}
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_with_references_returns_results(
+    client: AsyncClient,
+    session: AsyncSession,
+):
+    # Arrange
+    payload = {
+        "operations": [
+            {"op": "create_branch", "ref": "source", "data": data["branch1"]},
+            {"op": "create_branch", "ref": "target", "data": data["branch2"]},
+            {
+                "op": "create_change_request",
+                "branch_id": "$source",
+                "data": data["change_request1"],
+            },
+            {
+                "op": "create_change_request",
+                "branch_id": "$source",
+                "data": data["change_request2"],
+            },
+            {
+                "op": "move_change_requests",
+                "target_branch_id": "$target",
+                "source_branch_id": "$source",
+                "change_requests_numbers": [data["change_request1"]["number"]],
+            },
+        ]
+    }
+    # Act
+    response = await client.post(url="/batch/", json=payload)
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["op"] for result in body] == [op["op"] for op in payload["operations"]]
+    source_id = body[0]["result"]["id"]
+    target_id = body[1]["result"]["id"]
+    assert body[2]["result"]["branch_id"] == source_id
+    target_branch, source_branch = body[4]["result"]
+    assert [cr["number"] for cr in target_branch["change_requests"]] == [
+        data["change_request1"]["number"]
+    ]
+    assert [cr["number"] for cr in source_branch["change_requests"]] == [
+        data["change_request2"]["number"]
+    ]
+    assert target_branch["id"] == target_id
+    assert len(await crud.branch.read_many(session=session)) == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_with_failing_operation_rolls_back_everything(
+    client: AsyncClient,
+    session: AsyncSession,
+):
+    # Arrange
+    payload = {
+        "operations": [
+            {"op": "create_branch", "ref": "source", "data": data["branch1"]},
+            {"op": "create_branch", "ref": "target", "data": data["branch2"]},
+            {
+                "op": "move_change_requests",
+                "target_branch_id": "$target",
+                "source_branch_id": "$source",
+                "change_requests_numbers": ["I-DO-NOT-EXIST"],
+            },
+        ]
+    }
+    # Act
+    response = await client.post(url="/batch/", json=payload)
+    # Assert
+    assert response.status_code == 400
+    body = response.json()
+    assert body["detail"]["index"] == 2
+    assert body["detail"]["op"] == "move_change_requests"
+    session.expire_all()
+    assert await crud.branch.read_many(session=session) == []
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_with_unknown_reference_fails(client: AsyncClient):
+    # Arrange
+    payload = {
+        "operations": [
+            {"op": "create_change_request", "branch_id": "$nope", "data": data["change_request1"]},
+        ]
+    }
+    # Act
+    response = await client.post(url="/batch/", json=payload)
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["detail"] == {
+        "index": 0,
+        "op": "create_change_request",
+        "detail": "unknown reference $nope, reference a branch created by an earlier operation "
+        "of the batch",
+    }
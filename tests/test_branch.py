@@ -2,6 +2,7 @@ import pytest
 import pytest_asyncio
 from fastapi.encoders import jsonable_encoder
 from httpx import AsyncClient
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
@@ -253,3 +254,66 @@ async def test_move_change_requests_not_exists_between_branches_fails(
         "detail": f"the branch {source_branch_title} does not contain the following change "
         f"requests: ['I-DO-NOT-EXIST']",
     }
+
+
+@pytest.mark.asyncio
+async def test_read_branches_with_fields_returns_only_requested_fields(
+    client: AsyncClient,
+    empty_branches: list[schemas.Branch],
+):
+    # Act
+    response = await client.get(url="/branches/", params={"fields": "id,title"})
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body == [{"id": str(branch.id), "title": branch.title} for branch in empty_branches]
+
+
+@pytest.mark.asyncio
+async def test_read_branch_with_fields_includes_change_requests_only_when_requested(
+    client: AsyncClient,
+    branch: schemas.Branch,
+):
+    # Act
+    without_change_requests = await client.get(f"/branches/{branch.id}", params={"fields": "title"})
+    with_change_requests = await client.get(
+        f"/branches/{branch.id}", params={"fields": "title,change_requests"}
+    )
+    # Assert
+    assert without_change_requests.json() == {"title": branch.title}
+    body = with_change_requests.json()
+    assert body["title"] == branch.title
+    assert [cr["number"] for cr in body["change_requests"]] == [
+        cr.number for cr in branch.change_requests
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_branch_with_fields_loads_only_requested_columns(
+    session: AsyncSession,
+    branch: schemas.Branch,
+):
+    # Arrange
+    session.expunge_all()
+    # Act
+    db_branch = await crud.branch.read(session=session, obj_id=branch.id, fields=["title"])
+    # Assert
+    assert db_branch.title == branch.title
+    assert {"description", "change_requests"} <= inspect(db_branch).unloaded
+
+
+@pytest.mark.asyncio
+async def test_read_branch_with_unknown_fields_fails(
+    client: AsyncClient,
+    branch: schemas.Branch,
+):
+    # Act
+    response = await client.get(f"/branches/{branch.id}", params={"fields": "title,secret"})
+    # Assert
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": {
+            "loc": ["query", "fields"],
+            "msg": "unknown fields: ['secret']",
+        }
+    }
@@ -0,0 +1,132 @@
+import json
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from tests import factories
+
+
+data = {
+    "branch1": {"title": "Release train 42", "description": "Branch A"},
+    "branch2": {"title": "Release train 43", "description": "Branch B"},
+    "change_request1": {
+        "number": "CD1K9A7D7S",
+        "status": "D",
+        "description": "BC-Fishman-CICD Workbench Testing CR",
+        "type": "K",
+    },
+    "change_request2": {
+        "number": "CD1L9A7D7L",
+        "status": "R",
+        "description": "BC-Fishman-CICD TransportOfCopies Testing CR",
+        "type": "T",
+    },
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branches(session: AsyncSession) -> list[schemas.Branch]:
+    _branches = []
+    for branch_key, change_request_key in [
+        ("branch1", "change_request1"),
+        ("branch2", "change_request2"),
+    ]:
+        branch = await crud.branch.create(
+            session=session, in_obj=schemas.BranchCreate(**data[branch_key])
+        )
+        session.add(models.ChangeRequest(**data[change_request_key], branch_id=branch.id))
+        await session.commit()
+        await session.refresh(branch)
+        _branches.append(schemas.Branch.from_orm(branch))
+    return _branches
+
+
+@pytest.mark.asyncio
+async def test_diff_branches_returns_change_requests_only_in_each_branch(
+    client: AsyncClient,
+    branches: list[schemas.Branch],
+):
+    # Act
+    response = await client.get(f"/branches/{branches[0].id}/diff/{branches[1].id}")
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {
+        "only_in_branch": [data["change_request1"]["number"]],
+        "only_in_other": [data["change_request2"]["number"]],
+        "status_differences": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_diff_branches_with_stream_returns_ndjson(
+    client: AsyncClient,
+    branches: list[schemas.Branch],
+):
+    # Act
+    response = await client.get(
+        f"/branches/{branches[0].id}/diff/{branches[1].id}", params={"stream": True}
+    )
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {"number": data["change_request1"]["number"], "status": "D", "other_status": None},
+        {"number": data["change_request2"]["number"], "status": None, "other_status": "R"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_diff_branches_not_exists_fails(
+    client: AsyncClient,
+    branches: list[schemas.Branch],
+):
+    # Act
+    response = await client.get(
+        f"/branches/{branches[0].id}/diff/00000000-0000-0000-0000-000000000000"
+    )
+    # Assert
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_diff_many_branches_returns_statuses_per_branch(
+    client: AsyncClient,
+    branches: list[schemas.Branch],
+):
+    # Act
+    response = await client.get(
+        "/branches/diff", params={"branches_ids": [str(branch.id) for branch in branches]}
+    )
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "number": data["change_request1"]["number"],
+            "statuses": {str(branches[0].id): "D"},
+        },
+        {
+            "number": data["change_request2"]["number"],
+            "statuses": {str(branches[1].id): "R"},
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_diff_large_branches_with_stream(client: AsyncClient, session: AsyncSession):
+    # Arrange
+    branch_id, other_branch_id = await factories.create_branches(
+        session, count=2, change_requests_per_branch=5000
+    )
+    # Act
+    response = await client.get(
+        f"/branches/{branch_id}/diff/{other_branch_id}", params={"stream": True}
+    )
+    # Assert
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 10000
+    assert sum(line["other_status"] is None for line in lines) == 5000
@@ -0,0 +1,130 @@
+from uuid import UUID
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from tests import factories
+
+
+data = {
+    "branch": {"title": "Release sprint 46", "description": "Counted"},
+    "other_branch": {"title": "Release sprint 47", "description": "Counted too"},
+    "change_requests": {"CD1K930001": "D", "CD1K930002": "D", "CD1K930003": "R"},
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branches_ids(session: AsyncSession) -> list[str]:
+    branches_ids = []
+    for key in ["branch", "other_branch"]:
+        branch = await crud.branch.create(session=session, in_obj=schemas.BranchCreate(**data[key]))
+        branches_ids.append(str(branch.id))
+    for number, status in data["change_requests"].items():
+        session.add(
+            models.ChangeRequest(number=number, status=status, type="K", branch_id=branches_ids[0])
+        )
+    await session.commit()
+    return branches_ids
+
+
+async def read_stats(client: AsyncClient, branches_ids: list[str]) -> list[dict]:
+    response = await client.get(url="/branches/stats")
+    assert response.status_code == 200
+    return [stats for stats in response.json() if stats["branch_id"] in branches_ids]
+
+
+@pytest.mark.asyncio
+async def test_branch_stats_count_created_change_requests(
+    client: AsyncClient,
+    branches_ids: list[str],
+):
+    # Act
+    stats = await read_stats(client, branches_ids)
+    # Assert
+    assert stats == [
+        {
+            "branch_id": branches_ids[0],
+            "total": 3,
+            "statuses": {"D": 2, "R": 1},
+            "types": {"K": 3},
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_branch_stats_follow_moves_transitions_and_deletes(
+    client: AsyncClient,
+    session: AsyncSession,
+    branches_ids: list[str],
+):
+    # Arrange
+    branch_id, other_branch_id = branches_ids
+    # Act
+    await client.patch(
+        url=f"/branches/{other_branch_id}/move-change-requests/{branch_id}",
+        json=["CD1K930001"],
+    )
+    await client.post(
+        url=f"/branches/{branch_id}/change-requests/transition",
+        json={"numbers": ["CD1K930002"], "status": "R"},
+    )
+    change_request = await crud.change_request.read_with_branch_id(
+        session=session, obj_id="CD1K930003", branch_id=UUID(branch_id)
+    )
+    await crud.change_request.delete(session, db_obj=change_request)
+    # Assert
+    stats = {stats["branch_id"]: stats for stats in await read_stats(client, branches_ids)}
+    assert stats[branch_id] == {
+        "branch_id": branch_id,
+        "total": 1,
+        "statuses": {"R": 1},
+        "types": {"K": 1},
+    }
+    assert stats[other_branch_id] == {
+        "branch_id": other_branch_id,
+        "total": 1,
+        "statuses": {"D": 1},
+        "types": {"K": 1},
+    }
+
+
+@pytest.mark.asyncio
+async def test_branch_stats_count_bulk_inserts(client: AsyncClient, session: AsyncSession):
+    # Arrange
+    branches_ids = await factories.create_branches(
+        session, count=3, change_requests_per_branch=2000
+    )
+    # Act
+    stats = await read_stats(client, [str(branch_id) for branch_id in branches_ids])
+    # Assert
+    assert [branch_stats["total"] for branch_stats in stats] == [2000, 2000, 2000]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_repairs_drifted_counts(session: AsyncSession, branches_ids: list[str]):
+    # Arrange
+    await session.execute(
+        text("UPDATE branch_stats SET count = 42 WHERE branch_id = :branch_id AND status = 'D'"),
+        {"branch_id": branches_ids[0]},
+    )
+    await session.execute(
+        text(
+            "INSERT INTO branch_stats (branch_id, status, type, count) "
+            "VALUES (:branch_id, 'N', 'W', 7)"
+        ),
+        {"branch_id": branches_ids[1]},
+    )
+    # Act
+    repaired = await crud.branch_stats.reconcile(session=session)
+    # Assert
+    assert repaired == 2
+    rows = [
+        (str(row.branch_id), row.status.value, row.type.value, row.count)
+        for row in await crud.branch_stats.read_all(session=session)
+        if str(row.branch_id) in branches_ids
+    ]
+    assert rows == [(branches_ids[0], "D", "K", 2), (branches_ids[0], "R", "K", 1)]
@@ -1,10 +1,85 @@
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import crud, models, schemas
 
-data = {}
+
+data = {
+    "branch": {
+        "title": "Add sparse fieldsets",
+        "description": "Let clients choose the fields they need.",
+    },
+    "change_request": {
+        "number": "CD1K9A7D7S",
+        "status": "D",
+        "description": "BC-Fishman-CICD Workbench Testing CR",
+        "type": "K",
+    },
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch(session: AsyncSession) -> schemas.Branch:
+    branch = await crud.branch.create(session=session, in_obj=schemas.BranchCreate(**data["branch"]))
+    session.add(models.ChangeRequest(**data["change_request"], branch_id=branch.id))
+    await session.commit()
+    await session.refresh(branch)
+    return schemas.Branch.from_orm(branch)
 
 
 @pytest.mark.asyncio
 async def test_create_change_request(client: AsyncClient):
     pass
+
+
+@pytest.mark.asyncio
+async def test_read_change_request_returns_change_request(
+    client: AsyncClient,
+    branch: schemas.Branch,
+):
+    # Act
+    response = await client.get(
+        f"/branches/{branch.id}/change-requests/{data['change_request']['number']}"
+    )
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {**data["change_request"], "branch_id": str(branch.id)}
+
+
+@pytest.mark.asyncio
+async def test_read_change_request_with_fields_returns_only_requested_fields(
+    client: AsyncClient,
+    branch: schemas.Branch,
+):
+    # Act
+    response = await client.get(
+        f"/branches/{branch.id}/change-requests/{data['change_request']['number']}",
+        params={"fields": "number,status"},
+    )
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {
+        "number": data["change_request"]["number"],
+        "status": data["change_request"]["status"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_change_request_defaults_are_set_by_database(
+    session: AsyncSession,
+    branch: schemas.Branch,
+):
+    # Act
+    change_request = await crud.change_request.read_with_branch_id(
+        session=session,
+        obj_id=data["change_request"]["number"],
+        branch_id=branch.id,
+    )
+    transaction_started_at = await session.scalar(select(func.now()))
+    # Assert
+    assert change_request.created_at == transaction_started_at
+    assert change_request.status == schemas.change_request.StatusEnum.modifiable
+    assert change_request.type == schemas.change_request.TypeEnum.workbench
@@ -0,0 +1,181 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.db import async_session
+
+
+data = {
+    "branch1": {
+        "title": "Add delta sync endpoint",
+        "description": "Let consumers fetch only the rows changed since their last sync.",
+    },
+    "branch2": {
+        "title": "Add tombstones for deletes",
+        "description": "Keep deleted rows keys so consumers can drop them.",
+    },
+    "change_request1": {
+        "number": "CD1K9A7D7S",
+        "status": "D",
+        "description": "BC-Fishman-CICD Workbench Testing CR",
+        "type": "K",
+    },
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch(session: AsyncSession) -> schemas.Branch:
+    branch = await crud.branch.create(
+        session=session, in_obj=schemas.BranchCreate(**data["branch1"])
+    )
+    session.add(models.ChangeRequest(**data["change_request1"], branch_id=branch.id))
+    await session.commit()
+    await session.refresh(branch)
+    return schemas.Branch.from_orm(branch)
+
+
+async def read_changes(client: AsyncClient, since: str, **params) -> dict:
+    response = await client.get(url="/changes/", params={"since": since, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_read_changes_returns_created_rows(client: AsyncClient, branch: schemas.Branch):
+    # Act
+    body = await read_changes(client, since=0)
+    # Assert
+    assert [b["id"] for b in body["branches"]] == [str(branch.id)]
+    assert "change_requests" not in body["branches"][0]
+    assert [cr["number"] for cr in body["change_requests"]] == [
+        data["change_request1"]["number"]
+    ]
+    assert body["deleted"] == []
+    assert schemas.ChangeToken.parse(body["next_token"]).version == max(
+        body["branches"][0]["version"], body["change_requests"][0]["version"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_read_changes_since_token_returns_only_modified_rows(
+    client: AsyncClient, branch: schemas.Branch
+):
+    # Arrange
+    token = (await read_changes(client, since=0))["next_token"]
+    # Act
+    await client.patch(url=f"/branches/{branch.id}", json={"title": data["branch2"]["title"]})
+    body = await read_changes(client, since=token)
+    # Assert
+    assert [b["title"] for b in body["branches"]] == [data["branch2"]["title"]]
+    assert body["change_requests"] == []
+    assert (
+        schemas.ChangeToken.parse(body["next_token"]).version
+        > schemas.ChangeToken.parse(token).version
+    )
+    assert (await read_changes(client, since=body["next_token"]))["branches"] == []
+
+
+@pytest.mark.asyncio
+async def test_read_changes_returns_tombstones_for_deletes(client: AsyncClient):
+    # Arrange
+    response = await client.post(url="/branches/", json=data["branch2"])
+    branch_id = response.json()["id"]
+    token = (await read_changes(client, since=0))["next_token"]
+    # Act
+    await client.delete(f"/branches/{branch_id}")
+    body = await read_changes(client, since=token)
+    # Assert
+    assert body["branches"] == []
+    assert len(body["deleted"]) == 1
+    assert body["deleted"][0]["entity"] == "branch"
+    assert body["deleted"][0]["key"] == branch_id
+
+
+@pytest.mark.asyncio
+async def test_read_changes_with_limit_continues_from_token(
+    client: AsyncClient, branch: schemas.Branch
+):
+    # Act
+    first_page = await read_changes(client, since=0, limit=1)
+    second_page = await read_changes(client, since=first_page["next_token"], limit=1)
+    # Assert
+    assert len(first_page["branches"]) == 1
+    assert first_page["change_requests"] == []
+    assert len(second_page["change_requests"]) == 1
+    assert second_page["branches"] == []
+
+
+@pytest.mark.asyncio
+async def test_read_changes_returns_rows_committed_after_a_later_version(client: AsyncClient):
+    # Arrange
+    ids = []
+    try:
+        async with async_session() as slow, async_session() as fast:
+            # The slow transaction takes its version first, but commits after the fast one
+            slow_branch = models.Branch(**data["branch1"])
+            slow.add(slow_branch)
+            await slow.flush()
+            await slow.refresh(slow_branch)
+            fast_branch = models.Branch(**data["branch2"])
+            fast.add(fast_branch)
+            await fast.commit()
+            ids = [slow_branch.id, fast_branch.id]
+            slow_version = slow_branch.version
+            first = await read_changes(client, since="0")
+            await slow.commit()
+        # Act
+        second = await read_changes(client, since=first["next_token"])
+        # Assert
+        assert [b["id"] for b in first["branches"]] == [str(fast_branch.id)]
+        assert schemas.ChangeToken.parse(first["next_token"]).version > slow_version
+        assert str(slow_branch.id) in [b["id"] for b in second["branches"]]
+    finally:
+        async with async_session() as cleanup:
+            await cleanup.execute(delete(models.Branch).where(models.Branch.id.in_(ids)))
+            await cleanup.commit()
+
+
+@pytest.mark.asyncio
+async def test_read_changes_returns_late_rows_once_and_within_the_limit(client: AsyncClient):
+    # Arrange
+    ids = []
+    try:
+        async with async_session() as slow, async_session() as fast:
+            # A long writer stays in flight over several syncs, then commits two late rows
+            slow_branches = [
+                models.Branch(title=f"Long running import {index}") for index in range(2)
+            ]
+            slow.add_all(slow_branches)
+            await slow.flush()
+            fast_branch = models.Branch(**data["branch2"])
+            fast.add(fast_branch)
+            await fast.commit()
+            ids = [*(branch.id for branch in slow_branches), fast_branch.id]
+            first = await read_changes(client, since="0")
+            second = await read_changes(client, since=first["next_token"])
+            await slow.commit()
+        # Act
+        third = await read_changes(client, since=second["next_token"], limit=1)
+        fourth = await read_changes(client, since=third["next_token"], limit=1)
+        fifth = await read_changes(client, since=fourth["next_token"])
+        # Assert
+        assert [b["id"] for b in first["branches"]] == [str(fast_branch.id)]
+        assert second["branches"] == []
+        assert [b["id"] for b in third["branches"]] == [str(slow_branches[0].id)]
+        assert [b["id"] for b in fourth["branches"]] == [str(slow_branches[1].id)]
+        assert fifth["branches"] == []
+    finally:
+        async with async_session() as cleanup:
+            await cleanup.execute(delete(models.Branch).where(models.Branch.id.in_(ids)))
+            await cleanup.commit()
+
+
+@pytest.mark.asyncio
+async def test_read_changes_rejects_invalid_token(client: AsyncClient):
+    # Act
+    response = await client.get(url="/changes/", params={"since": "next"})
+    # Assert
+    assert response.status_code == 422
@@ -0,0 +1,144 @@
+import gzip
+import json
+import zlib
+
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+from starlette.types import Message, Receive, Scope, Send
+
+from app.middleware import CompressionMiddleware
+from app.middleware.compression import choose_encoding
+
+
+DECOMPRESS = {
+    "gzip": gzip.decompress,
+    "br": brotli.decompress,
+    "zstd": lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+}
+# Incremental decompressors, for the chunks of a stream
+DECOMPRESSORS = {
+    "gzip": lambda: zlib.decompressobj(31).decompress,
+    "br": lambda: brotli.Decompressor().process,
+    "zstd": lambda: zstandard.ZstdDecompressor().decompressobj().decompress,
+}
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, encodings=("zstd", "br", "gzip"))
+
+    @app.get("/small")
+    async def small():
+        return {"ping": "pong!"}
+
+    @app.get("/large")
+    async def large():
+        return [{"number": f"CD1K9{index:05}", "status": "D"} for index in range(100)]
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for index in range(100):
+                yield f'{{"number": "CD1K9{index:05}"}}\n'
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip, zstd", "zstd"),
+        ("zstd;q=0, gzip", "gzip"),
+        ("*", "zstd"),
+        ("identity", None),
+    ],
+)
+def test_choose_encoding(accept_encoding: str, expected: str):
+    # Act / Assert
+    assert choose_encoding(accept_encoding, ("zstd", "gzip")) == expected
+
+
+@pytest.mark.asyncio
+async def test_compresses_responses_over_minimum_size():
+    # Arrange
+    async with AsyncClient(app=create_app(), base_url="http://localhost:8000") as client:
+        # Act
+        large = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+        small = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+    # Assert
+    assert large.headers["content-encoding"] == "gzip"
+    assert int(large.headers["content-length"]) < len(large.content) / 5
+    assert len(large.json()) == 100
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"ping": "pong!"}
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+@pytest.mark.asyncio
+async def test_compresses_with_each_encoding(encoding: str):
+    # Arrange
+    async with AsyncClient(app=create_app(), base_url="http://localhost:8000") as client:
+        # Act
+        headers = {"Accept-Encoding": encoding}
+        async with client.stream("GET", "/large", headers=headers) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    # Assert
+    assert response.headers["content-encoding"] == encoding
+    assert int(response.headers["content-length"]) == len(raw)
+    assert len(json.loads(DECOMPRESS[encoding](raw))) == 100
+
+
+@pytest.mark.asyncio
+async def test_compresses_streamed_responses():
+    # Arrange
+    async with AsyncClient(app=create_app(), base_url="http://localhost:8000") as client:
+        # Act
+        async with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    # Assert
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw).decode().count("\n") == 100
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+@pytest.mark.asyncio
+async def test_flushes_each_streamed_chunk(encoding: str):
+    # Arrange
+    lines = [f'{{"number": "CD1K9{index:05}"}}\n'.encode() for index in range(3)]
+    messages: list[Message] = []
+
+    async def stream(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for line in lines:
+            await send({"type": "http.response.body", "body": line, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    middleware = CompressionMiddleware(stream, encodings=(encoding,))
+    scope = {"type": "http", "headers": [(b"accept-encoding", encoding.encode())]}
+    # Act
+    await middleware(scope, None, send)
+    # Assert
+    decompress = DECOMPRESSORS[encoding]()
+    chunks = [decompress(message["body"]) for message in messages[1:]]
+    assert chunks[:3] == lines
+
+
+@pytest.mark.asyncio
+async def test_sends_identity_when_no_encoding_is_accepted():
+    # Arrange
+    async with AsyncClient(app=create_app(), base_url="http://localhost:8000") as client:
+        # Act
+        response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+    # Assert
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 100
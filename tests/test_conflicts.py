@@ -0,0 +1,93 @@
+from uuid import UUID
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+
+
+data = {
+    "branch1": {"title": "Sales order enhancements", "description": "Branch A"},
+    "branch2": {"title": "Sales order hotfix", "description": "Branch B"},
+    "change_request1": {"number": "CD1K900001", "status": "D", "type": "K"},
+    "change_request2": {"number": "CD1K900002", "status": "D", "type": "K"},
+    "change_request3": {"number": "CD1K900003", "status": "D", "type": "K"},
+    "program": {"pgmid": "R3TR", "object_type": "PROG", "object_name": "ZSALES_ORDER"},
+    "class": {"pgmid": "R3TR", "object_type": "CLAS", "object_name": "ZCL_SALES_ORDER"},
+    "table": {"pgmid": "R3TR", "object_type": "TABL", "object_name": "ZSALES_ORDER_LOG"},
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch_ids(session: AsyncSession) -> list[UUID]:
+    branch_ids = []
+    for key in ("branch1", "branch2"):
+        branch = await crud.branch.create(session=session, in_obj=schemas.BranchCreate(**data[key]))
+        branch_ids.append(branch.id)
+    session.add(models.ChangeRequest(**data["change_request1"], branch_id=branch_ids[0]))
+    session.add(models.ChangeRequest(**data["change_request2"], branch_id=branch_ids[1]))
+    session.add(models.ChangeRequest(**data["change_request3"], branch_id=branch_ids[0]))
+    await session.commit()
+    return branch_ids
+
+
+async def put_objects(
+    client: AsyncClient, branch_id, change_request_key: str, object_keys: list[str]
+):
+    number = data[change_request_key]["number"]
+    return await client.put(
+        url=f"/branches/{branch_id}/change-requests/{number}/objects",
+        json=[data[object_key] for object_key in object_keys],
+    )
+
+
+@pytest.mark.asyncio
+async def test_replace_change_request_objects_returns_indexed_objects(
+    client: AsyncClient,
+    branch_ids: list[UUID],
+):
+    # Arrange
+    await put_objects(client, branch_ids[0], "change_request1", ["program", "class"])
+    # Act
+    response = await put_objects(client, branch_ids[0], "change_request1", ["table", "table"])
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == [
+        {**data["table"], "change_request_number": data["change_request1"]["number"]}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_replace_change_request_objects_of_other_branch_fails(
+    client: AsyncClient,
+    branch_ids: list[UUID],
+):
+    # Act
+    response = await put_objects(client, branch_ids[1], "change_request1", ["program"])
+    # Assert
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_read_branch_conflicts_returns_shared_objects(
+    client: AsyncClient,
+    branch_ids: list[UUID],
+):
+    # Arrange
+    await put_objects(client, branch_ids[0], "change_request1", ["program", "class"])
+    await put_objects(client, branch_ids[1], "change_request2", ["program"])
+    await put_objects(client, branch_ids[0], "change_request3", ["table"])
+    # Act
+    response = await client.get(f"/branches/{branch_ids[0]}/conflicts")
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 1
+    conflict = body[0]
+    assert {key: conflict[key] for key in data["program"]} == data["program"]
+    assert sorted(conflict["change_requests"], key=lambda cr: cr["number"]) == [
+        {"number": data["change_request1"]["number"], "branch_id": str(branch_ids[0])},
+        {"number": data["change_request2"]["number"], "branch_id": str(branch_ids[1])},
+    ]
@@ -0,0 +1,167 @@
+from datetime import timedelta
+from uuid import UUID
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.config import settings
+from app.utils import content_cache
+
+
+data = {
+    "branch": {"title": "Cache SAP content", "description": "Released content never changes"},
+    "released": {"number": "CD1K900001", "status": "R", "type": "K"},
+    "modifiable1": {"number": "CD1K900002", "status": "D", "type": "K"},
+    "modifiable2": {"number": "CD1K900003", "status": "D", "type": "K"},
+    "content": [{"pgmid": "R3TR", "object_type": "PROG", "object_name": "ZCACHED_REPORT"}],
+}
+
+
+class FakeSap:
+    def __init__(self) -> None:
+        self.fetched: list[str] = []
+
+    async def __call__(self, change_request_number: str) -> list[schemas.ChangeRequestObjectCreate]:
+        self.fetched.append(change_request_number)
+        return [schemas.ChangeRequestObjectCreate(**obj) for obj in data["content"]]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch_id(session: AsyncSession) -> UUID:
+    branch = await crud.branch.create(
+        session=session, in_obj=schemas.BranchCreate(**data["branch"])
+    )
+    branch_id = branch.id
+    for key in ("released", "modifiable1", "modifiable2"):
+        session.add(models.ChangeRequest(**data[key], branch_id=branch_id))
+    await session.commit()
+    return branch_id
+
+
+async def read_content(session: AsyncSession, branch_id: UUID, key: str, fetch: FakeSap):
+    change_request = await crud.change_request.read_with_branch_id(
+        session=session, obj_id=data[key]["number"], branch_id=branch_id
+    )
+    return await content_cache.read_content(
+        session=session, change_request=change_request, fetch=fetch
+    )
+
+
+@pytest.mark.asyncio
+async def test_read_content_caches_released_change_requests_forever(
+    session: AsyncSession, branch_id: UUID, monkeypatch: pytest.MonkeyPatch
+):
+    # Arrange
+    sap = FakeSap()
+    monkeypatch.setattr(settings, "SAP_CONTENT_CACHE_TTL", 0)
+    # Act
+    first = await read_content(session, branch_id, "released", sap)
+    second = await read_content(session, branch_id, "released", sap)
+    # Assert
+    assert first == second
+    assert sap.fetched == [data["released"]["number"]]
+
+
+@pytest.mark.asyncio
+async def test_read_content_refetches_expired_modifiable_change_requests(
+    session: AsyncSession, branch_id: UUID, monkeypatch: pytest.MonkeyPatch
+):
+    # Arrange
+    sap = FakeSap()
+    await read_content(session, branch_id, "modifiable1", sap)
+    await read_content(session, branch_id, "modifiable1", sap)
+    monkeypatch.setattr(settings, "SAP_CONTENT_CACHE_TTL", 0)
+    # Act
+    await read_content(session, branch_id, "modifiable1", sap)
+    # Assert
+    assert sap.fetched == [data["modifiable1"]["number"]] * 2
+
+
+@pytest.mark.asyncio
+async def test_read_content_marks_modifiable_content_used_once_it_aged(
+    session: AsyncSession, branch_id: UUID
+):
+    # Arrange
+    sap = FakeSap()
+    number = data["modifiable1"]["number"]
+    await read_content(session, branch_id, "modifiable1", sap)
+    aged = func.now() - timedelta(seconds=settings.SAP_CONTENT_CACHE_TTL / 2)
+    await session.execute(update(models.SapContent).values(accessed_at=aged))
+    # Act
+    content = await read_content(session, branch_id, "modifiable1", sap)
+    # Assert
+    assert [obj.object_name for obj in content] == ["ZCACHED_REPORT"]
+    assert sap.fetched == [number]
+    marked = await session.scalar(
+        select(models.SapContent.accessed_at == func.now()).where(
+            models.SapContent.change_request_number == number
+        )
+    )
+    assert marked
+
+
+@pytest.mark.asyncio
+async def test_read_content_evicts_modifiable_content_over_budget(
+    session: AsyncSession, branch_id: UUID, monkeypatch: pytest.MonkeyPatch
+):
+    # Arrange
+    sap = FakeSap()
+    size = len(content_cache.encode(await sap(data["released"]["number"])))
+    monkeypatch.setattr(settings, "SAP_CONTENT_CACHE_MAX_BYTES", size)
+    # Act
+    for key in ("released", "modifiable1", "modifiable2"):
+        await read_content(session, branch_id, key, sap)
+    # Assert
+    sizes = await crud.sap_content.read_sizes(session=session)
+    assert sizes == {True: size, False: size}
+
+
+@pytest.mark.asyncio
+async def test_read_change_request_content_endpoint(
+    client: AsyncClient, branch_id: UUID, monkeypatch: pytest.MonkeyPatch
+):
+    # Arrange
+    monkeypatch.setattr(content_cache, "fetch_from_sap", FakeSap())
+    number = data["released"]["number"]
+    # Act
+    response = await client.get(f"/branches/{branch_id}/change-requests/{number}/content")
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == data["content"]
+
+
+@pytest.mark.asyncio
+async def test_read_change_request_content_without_sap_integration_fails(
+    client: AsyncClient, session: AsyncSession, branch_id: UUID, monkeypatch: pytest.MonkeyPatch
+):
+    # Arrange
+    monkeypatch.setattr(settings, "SAP_AUTH_URL", None)
+    number = data["released"]["number"]
+    # Act
+    response = await client.get(f"/branches/{branch_id}/change-requests/{number}/content")
+    # Assert
+    assert response.status_code == 501
+    assert await crud.sap_content.read_sizes(session=session) == {}
+
+
+@pytest.mark.asyncio
+async def test_read_change_request_content_without_content_from_sap_fails(
+    client: AsyncClient, session: AsyncSession, branch_id: UUID, monkeypatch: pytest.MonkeyPatch
+):
+    # Arrange
+    from app.utils import sap
+
+    monkeypatch.setattr(settings, "SAP_AUTH_URL", "http://sap.invalid/auth")
+    number = data["released"]["number"]
+    # Act
+    try:
+        response = await client.get(f"/branches/{branch_id}/change-requests/{number}/content")
+    finally:
+        await sap.close_client()
+    # Assert
+    assert response.status_code == 503
+    assert await crud.sap_content.read_sizes(session=session) == {}
@@ -0,0 +1,65 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, deps
+from app.db import async_session, engine, outside_transaction
+
+
+@pytest.mark.asyncio
+async def test_session_checks_out_connection_on_first_statement_only():
+    # Arrange
+    checked_out = engine.pool.checkedout()
+    session = async_session()
+    try:
+        # Act & Assert
+        assert engine.pool.checkedout() == checked_out
+        await session.execute(text("SELECT 1"))
+        assert engine.pool.checkedout() == checked_out + 1
+        async with outside_transaction(session):
+            assert engine.pool.checkedout() == checked_out
+    finally:
+        await session.close()
+
+
+@pytest.mark.asyncio
+async def test_session_route_releases_connection_before_response():
+    # Arrange
+    router = APIRouter(route_class=deps.SessionRoute)
+    checked_out = []
+
+    @router.get("/")
+    async def read(session: AsyncSession = Depends(deps.get_session)):
+        await session.execute(text("SELECT 1"))
+        return {"value": 1}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.middleware("http")
+    async def record_checked_out(request, call_next):
+        response = await call_next(request)
+        checked_out.append(engine.pool.checkedout())
+        return response
+
+    before = engine.pool.checkedout()
+    async with AsyncClient(app=app, base_url="http://localhost:8000") as client:
+        # Act
+        response = await client.get("/")
+    # Assert
+    assert response.json() == {"value": 1}
+    assert checked_out == [before]
+
+
+def test_crud_statements_share_cache_key_across_parameters():
+    # Act
+    first = crud.branch.read_statement(obj_id=uuid4(), fields=["id", "title"])
+    second = crud.branch.read_statement(obj_id=uuid4(), fields=["id", "title"])
+    other_fields = crud.branch.read_statement(obj_id=uuid4(), fields=["id"])
+    # Assert
+    assert first._generate_cache_key().key == second._generate_cache_key().key
+    assert first._generate_cache_key().key != other_fields._generate_cache_key().key
@@ -0,0 +1,131 @@
+import asyncio
+from uuid import UUID
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.config import settings
+from app.utils.scheduler import ImportFailed, plan_waves, run_plan
+
+
+data = {
+    "branch": {"title": "Pricing rework", "description": "Imports scheduled in waves"},
+    "numbers": ["CD1K900001", "CD1K900002", "CD1K900003", "CD1K900004"],
+    "program": {"pgmid": "R3TR", "object_type": "PROG", "object_name": "ZPRICING"},
+    "class": {"pgmid": "R3TR", "object_type": "CLAS", "object_name": "ZCL_PRICING"},
+    "table": {"pgmid": "R3TR", "object_type": "TABL", "object_name": "ZPRICING_LOG"},
+}
+
+
+class FakeImporter:
+    """
+    Records the imports and the highest number of concurrent ones.
+    """
+
+    def __init__(self, failing: tuple[str, ...] = ()) -> None:
+        self.failing = failing
+        self.imported: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, number: str) -> None:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if number in self.failing:
+            raise RuntimeError(f"import of {number} failed")
+        self.imported.append(number)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch_id(session: AsyncSession) -> UUID:
+    branch = await crud.branch.create(
+        session=session, in_obj=schemas.BranchCreate(**data["branch"])
+    )
+    branch_id = branch.id
+    for number in data["numbers"]:
+        session.add(models.ChangeRequest(number=number, status="D", type="K", branch_id=branch_id))
+    await session.commit()
+    return branch_id
+
+
+def test_plan_waves_orders_dependent_change_requests():
+    # Arrange
+    numbers = ["A", "B", "C", "D", "E"]
+    dependencies = [("C", "A"), ("D", "C"), ("D", "B")]
+    # Act
+    waves = plan_waves(numbers=numbers, dependencies=dependencies)
+    # Assert
+    assert waves == [["A", "B", "E"], ["C"], ["D"]]
+
+
+def test_plan_waves_skips_dependencies_of_unknown_change_requests():
+    # Arrange
+    dependencies = [("B", "A"), ("C", "B"), ("B", "X")]
+    # Act
+    waves = plan_waves(numbers=["A", "B"], dependencies=dependencies)
+    # Assert
+    assert waves == [["A"], ["B"]]
+
+
+def test_plan_waves_rejects_cycles():
+    # Act & Assert
+    with pytest.raises(ValueError):
+        plan_waves(numbers=["A", "B"], dependencies=[("A", "B"), ("B", "A")])
+
+
+@pytest.mark.asyncio
+async def test_run_plan_imports_waves_in_order_up_to_slots():
+    # Arrange
+    importer = FakeImporter()
+    waves = [["A", "B", "C"], ["D"]]
+    # Act
+    await run_plan(waves=waves, importer=importer, slots=2)
+    # Assert
+    assert sorted(importer.imported[:3]) == ["A", "B", "C"]
+    assert importer.imported[3] == "D"
+    assert importer.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_run_plan_stops_after_failed_wave():
+    # Arrange
+    importer = FakeImporter(failing=("B",))
+    # Act
+    with pytest.raises(ImportFailed) as error:
+        await run_plan(waves=[["A", "B"], ["C"]], importer=importer, slots=2)
+    # Assert
+    assert list(error.value.failures) == ["B"]
+    assert importer.imported == ["A"]
+
+
+@pytest.mark.asyncio
+async def test_read_branch_import_plan_groups_independent_change_requests(
+    client: AsyncClient,
+    branch_id: UUID,
+):
+    # Arrange
+    numbers = data["numbers"]
+    contents = {
+        numbers[0]: ["program"],
+        numbers[1]: ["table"],
+        numbers[2]: ["program", "class"],
+        numbers[3]: ["class", "table"],
+    }
+    for number, object_keys in contents.items():
+        await client.put(
+            url=f"/branches/{branch_id}/change-requests/{number}/objects",
+            json=[data[object_key] for object_key in object_keys],
+        )
+    # Act
+    response = await client.get(f"/branches/{branch_id}/import-plan")
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {
+        "slots": settings.SAP_IMPORT_SLOTS,
+        "waves": [[numbers[0], numbers[1]], [numbers[2]], [numbers[3]]],
+    }
@@ -0,0 +1,13 @@
+import pytest
+
+from app import lifespan
+from app.db import engine
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool_opens_connections():
+    # Act
+    await lifespan.warm_up_pool(size=2)
+    # Assert
+    assert engine.pool.checkedin() >= 2
+
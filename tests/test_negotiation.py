@@ -0,0 +1,99 @@
+import msgpack
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.middleware.negotiation import columnar, negotiate
+
+
+data = {
+    "branch": {"title": "Release sprint 45", "description": "Compact"},
+    "change_requests": ["CD1K920001", "CD1K920002"],
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch_id(session: AsyncSession) -> str:
+    branch = await crud.branch.create(
+        session=session, in_obj=schemas.BranchCreate(**data["branch"])
+    )
+    branch_id = str(branch.id)
+    for number in data["change_requests"]:
+        session.add(models.ChangeRequest(number=number, status="D", type="K", branch_id=branch_id))
+    await session.commit()
+    return branch_id
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        ("", "application/json"),
+        ("*/*", "application/json"),
+        ("application/x-msgpack", "application/msgpack"),
+        ("application/json;q=0.5, application/msgpack", "application/msgpack"),
+        ("application/msgpack;q=0.5, application/json", "application/json"),
+        ("text/html, application/vnd.columnar+json", "application/vnd.columnar+json"),
+    ],
+)
+def test_negotiate(accept: str, expected: str):
+    # Act / Assert
+    assert negotiate(accept) == expected
+
+
+def test_columnar_sends_field_names_once():
+    # Arrange
+    items = [{"number": "A", "status": "D"}, {"number": "B", "tags": [{"name": "x"}]}]
+    # Act
+    result = columnar(items)
+    # Assert
+    assert result == {
+        "columns": ["number", "status", "tags"],
+        "rows": [
+            ["A", "D", None],
+            ["B", None, {"columns": ["name"], "rows": [["x"]]}],
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_read_branch_as_msgpack(client: AsyncClient, branch_id: str):
+    # Arrange
+    expected = (await client.get(url=f"/branches/{branch_id}")).json()
+    # Act
+    response = await client.get(
+        url=f"/branches/{branch_id}", headers={"Accept": "application/msgpack"}
+    )
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert "Accept" in response.headers["vary"]
+    assert msgpack.unpackb(response.content) == expected
+
+
+@pytest.mark.asyncio
+async def test_read_branches_as_columnar_json(client: AsyncClient, branch_id: str):
+    # Act
+    response = await client.get(
+        url="/branches/", headers={"Accept": "application/vnd.columnar+json"}
+    )
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    row = next(row for row in body["rows"] if row[body["columns"].index("id")] == branch_id)
+    change_requests = row[body["columns"].index("change_requests")]
+    numbers = [row[change_requests["columns"].index("number")] for row in change_requests["rows"]]
+    assert numbers == data["change_requests"]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_negotiated_too(client: AsyncClient):
+    # Act
+    response = await client.get(
+        url="/branches/00000000-0000-0000-0000-000000000000",
+        headers={"Accept": "application/msgpack"},
+    )
+    # Assert
+    assert response.status_code == 404
+    assert msgpack.unpackb(response.content) == {"detail": "Branch not found"}
@@ -0,0 +1,84 @@
+import json
+import pstats
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.db import engine
+from app.middleware import ProfilingMiddleware, track_sql_timings, untrack_sql_timings
+
+
+@pytest.fixture(autouse=True)
+def sql_timings_tracked() -> None:
+    track_sql_timings(engine.sync_engine)
+    yield
+    untrack_sql_timings(engine.sync_engine)
+
+
+def create_app(directory: Path, sample_every: int = 0) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=str(directory),
+        token="secret",
+        sample_every=sample_every,
+    )
+
+    @app.get("/slow")
+    async def slow():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT pg_sleep(0.01)"))
+        return {"done": True}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_profiled_request_stores_profile_with_sql_timings(tmp_path: Path):
+    # Arrange
+    app = create_app(tmp_path)
+    async with AsyncClient(app=app, base_url="http://localhost:8000") as client:
+        # Act
+        response = await client.get("/slow", headers={"X-Profile": "secret"})
+    # Assert
+    assert response.status_code == 200
+    name = response.headers["X-Profile"]
+    assert "db;dur=" in response.headers["Server-Timing"]
+    assert "1 queries" in response.headers["Server-Timing"]
+    timings = json.loads((tmp_path / f"{name}.sql.json").read_text())
+    assert timings[0]["statement"] == "SELECT pg_sleep(0.01)"
+    assert timings[0]["duration_ms"] >= 10
+    assert pstats.Stats(str(tmp_path / f"{name}.prof")).total_calls > 0
+
+
+@pytest.mark.asyncio
+async def test_request_without_valid_token_is_not_profiled(tmp_path: Path):
+    # Arrange
+    app = create_app(tmp_path)
+    async with AsyncClient(app=app, base_url="http://localhost:8000") as client:
+        # Act
+        response = await client.get("/slow", params={"profile": "wrong"})
+    # Assert
+    assert "X-Profile" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_sampled_mode_profiles_one_in_n_requests(tmp_path: Path):
+    # Arrange
+    app = create_app(tmp_path, sample_every=2)
+    async with AsyncClient(app=app, base_url="http://localhost:8000") as client:
+        # Act
+        responses = [await client.get("/slow") for _ in range(4)]
+    # Assert
+    assert ["X-Profile" in response.headers for response in responses] == [
+        False,
+        True,
+        False,
+        True,
+    ]
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+
@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.utils import sap
+from app.utils.metrics import metrics
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, CircuitState, hedge
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubSap:
+    """
+    Stands in for the SAP gateway, answering with the queued (latency, status) responses.
+    """
+
+    def __init__(self, *responses: tuple[float, int]) -> None:
+        self.responses = list(responses)
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        latency, status_code = self.responses[min(self.requests, len(self.responses) - 1)]
+        self.requests += 1
+        await asyncio.sleep(latency)
+        return httpx.Response(status_code, headers={"x-csrf-token": str(self.requests)})
+
+
+async def fail() -> None:
+    raise RuntimeError("SAP is down")
+
+
+async def succeed() -> str:
+    return "ok"
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_after_consecutive_failures():
+    # Arrange
+    breaker = CircuitBreaker(name="test", failure_threshold=2, reset_timeout=30, clock=Clock())
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+    # Act & Assert
+    assert breaker.state == CircuitState.open
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(succeed)
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_closes_after_successful_trial():
+    # Arrange
+    clock = Clock()
+    breaker = CircuitBreaker(name="test", failure_threshold=1, reset_timeout=30, clock=clock)
+    with pytest.raises(RuntimeError):
+        await breaker.call(fail)
+    clock.now = 30
+    # Act
+    assert breaker.state == CircuitState.half_open
+    result = await breaker.call(succeed)
+    # Assert
+    assert result == "ok"
+    assert breaker.state == CircuitState.closed
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_reopens_after_failed_trial():
+    # Arrange
+    clock = Clock()
+    breaker = CircuitBreaker(name="test", failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+    clock.now = 30
+    # Act
+    with pytest.raises(RuntimeError):
+        await breaker.call(fail)
+    # Assert
+    assert breaker.state == CircuitState.open
+
+
+@pytest.mark.asyncio
+async def test_hedge_returns_the_faster_duplicate():
+    # Arrange
+    latencies = [1, 0]
+
+    async def call() -> float:
+        latency = latencies.pop(0)
+        await asyncio.sleep(latency)
+        return latency
+
+    hedged = metrics.get("test_hedged")
+    # Act
+    result = await hedge(call, delay=0.01, name="test")
+    # Assert
+    assert result == 0
+    assert metrics.get("test_hedged") == hedged + 1
+
+
+@pytest.mark.asyncio
+async def test_sap_request_counts_server_errors_and_fails_fast(monkeypatch: pytest.MonkeyPatch):
+    # Arrange
+    stub = StubSap((0, 503))
+    breaker = CircuitBreaker(name="sap", failure_threshold=2, reset_timeout=30)
+    monkeypatch.setattr(sap, "breaker", breaker)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(stub)) as client:
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await sap.request(client, "GET", "http://sap/auth", operation="auth")
+        # Act & Assert
+        with pytest.raises(CircuitOpenError):
+            await sap.request(client, "GET", "http://sap/auth", operation="auth")
+    assert stub.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_sap_request_hedges_slow_idempotent_requests(monkeypatch: pytest.MonkeyPatch):
+    # Arrange
+    stub = StubSap((1, 200), (0, 200))
+    monkeypatch.setattr(settings, "SAP_HEDGE_DELAY", 0.01)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(stub)) as client:
+        # Act
+        response = await sap.request(
+            client, "GET", "http://sap/auth", operation="auth", idempotent=True
+        )
+    # Assert
+    assert response.headers["x-csrf-token"] == "2"
@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+from typing import Awaitable
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.utils.metrics import metrics
+from app.utils.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_with_same_key_execute_once():
+    # Arrange
+    flight = SingleFlight(name="test_same_key")
+    executions = 0
+
+    async def fn() -> int:
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    # Act
+    results = await asyncio.gather(*(flight.do(key="key", fn=fn) for _ in range(5)))
+    # Assert
+    assert executions == 1
+    assert [result for result, _ in results] == [42] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert metrics.get("test_same_key_executed") == 1
+    assert metrics.get("test_same_key_coalesced") == 4
+
+
+@pytest.mark.asyncio
+async def test_calls_with_different_keys_or_not_concurrent_execute_separately():
+    # Arrange
+    flight = SingleFlight(name="test_different_keys")
+
+    async def fn() -> None:
+        await asyncio.sleep(0.01)
+
+    # Act
+    await asyncio.gather(flight.do(key=1, fn=fn), flight.do(key=2, fn=fn))
+    await flight.do(key=1, fn=fn)
+    # Assert
+    assert metrics.get("test_different_keys_executed") == 3
+    assert metrics.get("test_different_keys_coalesced") == 0
+
+
+@pytest.mark.asyncio
+async def test_call_exception_is_raised_to_every_caller():
+    # Arrange
+    flight = SingleFlight(name="test_exception")
+
+    async def fn() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    # Act
+    results = await asyncio.gather(
+        flight.do(key="key", fn=fn),
+        flight.do(key="key", fn=fn),
+        return_exceptions=True,
+    )
+    # Assert
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_branch_reads_are_coalesced(client: AsyncClient, session: AsyncSession):
+    # Arrange
+    branch = await crud.branch.create(
+        session=session,
+        in_obj=schemas.BranchCreate(title="Coalesce hot reads", description="Single-flight"),
+    )
+    coalesced = metrics.get("branch_reads_coalesced")
+    # Act
+    branches = await asyncio.gather(
+        *(crud.branch.read(session=session, obj_id=branch.id, coalesce=True) for _ in range(3))
+    )
+    response = await client.get("/metrics/")
+    # Assert
+    assert [b.id for b in branches] == [branch.id] * 3
+    assert metrics.get("branch_reads_coalesced") == coalesced + 2
+    assert response.json()["branch_reads_coalesced"] == coalesced + 2
+
+
+@pytest.mark.asyncio
+async def test_coalesced_read_survives_the_first_caller_being_cancelled(session: AsyncSession):
+    # Arrange
+    branch = await crud.branch.create(
+        session=session,
+        in_obj=schemas.BranchCreate(title="Cancelled leader", description="Single-flight"),
+    )
+    first_session = AsyncSession(bind=session.bind)
+
+    async def execute(own_session: AsyncSession) -> models.Branch:
+        await own_session.execute(text("SELECT pg_sleep(0.05)"))
+        return await own_session.get(models.Branch, branch.id)
+
+    def read(read_session: AsyncSession) -> Awaitable[models.Branch]:
+        return crud.branch.read_coalesced(session=read_session, key="leader", execute=execute)
+
+    first = asyncio.create_task(read(first_session))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(read(session))
+    await asyncio.sleep(0.01)
+    # Act
+    first.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await first
+    await first_session.close()
+    db_obj = await second
+    # Assert
+    assert first.cancelled()
+    assert db_obj.id == branch.id
+    assert db_obj in session
@@ -0,0 +1,79 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+
+
+data = {
+    "branch": {"title": "Release sprint 42", "description": "Release all at once"},
+    "change_requests": {
+        "CD1K900001": "D",
+        "CD1K900002": "L",
+        "CD1K900003": "R",
+    },
+}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def branch_id(session: AsyncSession) -> str:
+    branch = await crud.branch.create(
+        session=session, in_obj=schemas.BranchCreate(**data["branch"])
+    )
+    branch_id = str(branch.id)
+    for number, status in data["change_requests"].items():
+        session.add(
+            models.ChangeRequest(number=number, status=status, type="K", branch_id=branch_id)
+        )
+    await session.commit()
+    return branch_id
+
+
+@pytest.mark.asyncio
+async def test_transition_change_requests_releases_allowed_ones(
+    client: AsyncClient,
+    branch_id: str,
+):
+    # Act
+    response = await client.post(
+        url=f"/branches/{branch_id}/change-requests/transition",
+        json={"numbers": [*data["change_requests"], "CD1K999999"], "status": "R"},
+    )
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["transitioned"] == ["CD1K900001", "CD1K900002"]
+    assert [(item["number"], item["status"]) for item in body["rejected"]] == [
+        ("CD1K900003", "R"),
+        ("CD1K999999", None),
+    ]
+    statuses = {
+        cr["number"]: cr["status"]
+        for cr in (await client.get(f"/branches/{branch_id}")).json()["change_requests"]
+    }
+    assert statuses == {"CD1K900001": "R", "CD1K900002": "R", "CD1K900003": "R"}
+
+
+@pytest.mark.asyncio
+async def test_transition_change_requests_rejects_disallowed_transition(
+    client: AsyncClient,
+    branch_id: str,
+):
+    # Act
+    response = await client.post(
+        url=f"/branches/{branch_id}/change-requests/transition",
+        json={"numbers": ["CD1K900003"], "status": "D"},
+    )
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {
+        "transitioned": [],
+        "rejected": [
+            {
+                "number": "CD1K900003",
+                "status": "R",
+                "detail": "can not move from released to modifiable",
+            }
+        ],
+    }